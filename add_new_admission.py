@@ -1,5 +1,7 @@
-from app import app, db, Patient, Admission, Department, Doctor, AdmissionType
+from database import session_scope
+from models import Patient, Admission, Department, Doctor, AdmissionType
 from datetime import datetime
+import rollup
 
 def add_new_admission(patient_id, department_id, admission_type_id, doctor_username, condition, fee):
     """
@@ -13,25 +15,25 @@ def add_new_admission(patient_id, department_id, admission_type_id, doctor_usern
         condition (str): Patient's condition
         fee (float): Admission fee
     """
-    with app.app_context():
+    with session_scope() as session:
         try:
             # Validate patient exists
-            patient = Patient.query.get(patient_id)
+            patient = session.get(Patient, patient_id)
             if not patient:
                 raise ValueError(f"Patient with ID {patient_id} not found")
 
             # Validate department exists
-            department = Department.query.get(department_id)
+            department = session.get(Department, department_id)
             if not department:
                 raise ValueError(f"Department with ID {department_id} not found")
 
             # Validate admission type exists
-            admission_type = AdmissionType.query.get(admission_type_id)
+            admission_type = session.get(AdmissionType, admission_type_id)
             if not admission_type:
                 raise ValueError(f"Admission type with ID {admission_type_id} not found")
 
             # Validate doctor exists
-            doctor = Doctor.query.get(doctor_username)
+            doctor = session.get(Doctor, doctor_username)
             if not doctor:
                 raise ValueError(f"Doctor with username {doctor_username} not found")
 
@@ -48,8 +50,10 @@ def add_new_admission(patient_id, department_id, admission_type_id, doctor_usern
             )
 
             # Add to database
-            db.session.add(new_admission)
-            db.session.commit()
+            session.add(new_admission)
+            session.flush()
+            rollup.record_admission(session, new_admission.admissionid)
+            session.commit()
 
             # Print confirmation
             print("\nNew Admission Added Successfully:")
@@ -67,7 +71,7 @@ def add_new_admission(patient_id, department_id, admission_type_id, doctor_usern
 
         except Exception as e:
             print(f"Error adding new admission: {str(e)}")
-            db.session.rollback()
+            session.rollback()
             return None
 
 def print_available_options():
@@ -75,23 +79,24 @@ def print_available_options():
     print("\nAvailable Options:")
     print("=" * 80)
     
-    # Print departments
-    print("\nDepartments:")
-    departments = Department.query.all()
-    for dept in departments:
-        print(f"{dept.deptid}: {dept.deptname}")
+    with session_scope() as session:
+        # Print departments
+        print("\nDepartments:")
+        departments = session.query(Department).all()
+        for dept in departments:
+            print(f"{dept.deptid}: {dept.deptname}")
     
-    # Print admission types
-    print("\nAdmission Types:")
-    types = AdmissionType.query.all()
-    for t in types:
-        print(f"{t.admissiontypeid}: {t.admissiontypename}")
+        # Print admission types
+        print("\nAdmission Types:")
+        types = session.query(AdmissionType).all()
+        for t in types:
+            print(f"{t.admissiontypeid}: {t.admissiontypename}")
     
-    # Print doctors
-    print("\nDoctors:")
-    doctors = Doctor.query.all()
-    for doc in doctors:
-        print(f"{doc.username}: {doc.doctorname}")
+        # Print doctors
+        print("\nDoctors:")
+        doctors = session.query(Doctor).all()
+        for doc in doctors:
+            print(f"{doc.username}: {doc.doctorname}")
     
     print("=" * 80)
 
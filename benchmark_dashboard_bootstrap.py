@@ -0,0 +1,140 @@
+"""First-paint latency of the dashboard: request fan-out vs /api/dashboard/bootstrap.
+
+Serves the app on a local port and, for each round, times until every
+response the dashboard needs for its first paint has arrived:
+
+- ``fan-out``: the eight requests the page used to send on load (five
+  statistics endpoints, recent admissions, department and doctor
+  statistics), sent together over at most ``--connections`` keep-alive
+  connections like a browser (six per host by default)
+- ``fan-out + modal``: the same plus the four requests the admission
+  modal sends when it first opens, which the bootstrap also covers
+- ``bootstrap``: one request, payloads run one after another
+- ``bootstrap parallel``: one request, payloads on the thread pool
+
+``--cold`` clears the statistics response cache before every round, as
+after a write; otherwise cached statistics serve the fan-out.
+
+    python benchmark_dashboard_bootstrap.py --rounds 50
+"""
+import argparse
+import http.client
+import logging
+import queue
+import statistics
+import threading
+import time
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+from werkzeug.serving import make_server
+
+from app import app, db, stats_cache
+
+FAN_OUT = [
+    '/api/statistics/patients',
+    '/api/statistics/admissions',
+    '/api/statistics/revenue',
+    '/api/statistics/beds',
+    '/api/statistics/doctors/count',
+    '/api/recent-admissions?filter=all',
+    '/api/statistics/departments',
+    '/api/statistics/doctors',
+]
+MODAL = ['/api/departments', '/api/doctors', '/api/admission-types', '/api/patients']
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def login(port, username, password):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', '/login', body=urlencode({'loginid': username, 'passid': password}),
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    if not cookie:
+        raise SystemExit('Login failed; check --username/--password')
+    return cookie.split(';', 1)[0]
+
+
+class Browser:
+    """``connections`` keep-alive connections fetching queued paths"""
+
+    def __init__(self, port, cookie, connections):
+        self.headers = {'Cookie': cookie, 'Accept': 'application/json'}
+        self.paths = queue.Queue()
+        self.done = queue.Queue()
+        for _ in range(connections):
+            threading.Thread(target=self._worker, args=(port,), daemon=True).start()
+
+    def _worker(self, port):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        while True:
+            path = self.paths.get()
+            conn.request('GET', path, headers=self.headers)
+            response = conn.getresponse()
+            response.read()
+            self.done.put((path, response.status))
+
+    def fetch_all(self, paths):
+        """Seconds until every path has been fetched"""
+        started = time.perf_counter()
+        for path in paths:
+            self.paths.put(path)
+        for _ in paths:
+            path, status = self.done.get()
+            if status != 200:
+                raise SystemExit(f'{path} returned {status}')
+        return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare dashboard first paint: fan-out vs bootstrap')
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--connections', type=int, default=6, help='concurrent connections, as a browser')
+    parser.add_argument('--cold', action='store_true', help='clear the statistics cache before every round')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--port', type=int, default=5056)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    browser = Browser(args.port, login(args.port, args.username, args.password), args.connections)
+
+    scenarios = [
+        ('fan-out', FAN_OUT),
+        ('fan-out + modal', FAN_OUT + MODAL),
+        ('bootstrap', ['/api/dashboard/bootstrap?parallel=0']),
+        ('bootstrap parallel', ['/api/dashboard/bootstrap?parallel=1']),
+    ]
+    print(f"\nDashboard first paint, {args.rounds} rounds, {args.connections} connections"
+          f"{', cold statistics cache' if args.cold else ''}")
+    print("=" * 78)
+    print(f"{'Scenario':<22} {'Requests':>8} {'Queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for label, paths in scenarios:
+        browser.fetch_all(paths)
+        timings, queries = [], 0
+        for _ in range(args.rounds):
+            if args.cold:
+                stats_cache.backend.clear()
+            before = counter.count
+            timings.append(browser.fetch_all(paths) * 1000)
+            queries += counter.count - before
+        print(f"{label:<22} {len(paths):>8} {queries / args.rounds:>8.1f} {statistics.median(timings):>9.2f} "
+              f"{sorted(timings)[int(0.95 * (len(timings) - 1))]:>9.2f} {max(timings):>9.2f}")
+    print("=" * 78)
+    server.shutdown()
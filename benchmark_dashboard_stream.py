@@ -0,0 +1,185 @@
+"""Load test for /api/stream/dashboard.
+
+Serves the app on a local port, connects N SSE clients, then admits and
+discharges a patient at a fixed rate through the API while counting every
+SQL statement the engine executes. With push fan-out the queries per minute
+depend only on the write rate, not on the number of connected dashboards.
+
+    python benchmark_dashboard_stream.py --clients 10 100 1000 --duration 30
+"""
+import argparse
+import http.client
+import json
+import resource
+import selectors
+import socket
+import threading
+import time
+from urllib.parse import urlencode
+
+from sqlalchemy import event, text
+from werkzeug.serving import make_server
+
+from app import app, db, dashboard_events
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+
+def login(port, username, password):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', '/login', body=urlencode({'loginid': username, 'passid': password}),
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    if not cookie:
+        raise SystemExit('Login failed; check --username/--password')
+    return cookie.split(';', 1)[0]
+
+
+def open_stream(port, cookie):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall((f"GET /api/stream/dashboard HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                  f"Accept: text/event-stream\r\nCookie: {cookie}\r\n\r\n").encode())
+    sock.setblocking(False)
+    return sock
+
+
+class StreamReader(threading.Thread):
+    """Reads every client socket from one thread and counts delivered events"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.selector = selectors.DefaultSelector()
+        self.delivered = 0
+        self.running = True
+
+    def add(self, sock):
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def run(self):
+        while self.running:
+            for key, _ in self.selector.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(65536)
+                except (BlockingIOError, ConnectionError):
+                    continue
+                self.delivered += data.count(b'event: admitted') + data.count(b'event: discharged')
+
+    def close(self):
+        self.running = False
+        self.join()
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+            key.fileobj.close()
+
+
+def pick_admission_fields():
+    with app.app_context():
+        row = db.session.execute(text(
+            "SELECT (SELECT patientid FROM patient p WHERE NOT EXISTS ("
+            "    SELECT 1 FROM admission a WHERE a.patient = p.patientid AND a.dischargedate IS NULL)"
+            "  ORDER BY patientid LIMIT 1),"
+            " (SELECT deptid FROM department ORDER BY deptid LIMIT 1),"
+            " (SELECT username FROM doctordetails ORDER BY username LIMIT 1),"
+            " (SELECT admissiontypeid FROM admissiontype ORDER BY admissiontypeid LIMIT 1)"
+        )).one()
+        if None in row:
+            raise SystemExit('Need at least one free patient, department, doctor and admission type')
+        return {'patient_id': row[0], 'department_id': row[1],
+                'doctor_username': row[2], 'admission_type_id': row[3], 'fee': 100}
+
+
+def write_events(port, cookie, fields, events_per_minute, duration):
+    """Alternate admitting and discharging one patient; return events published"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Content-Type': 'application/json', 'Cookie': cookie}
+    interval = 60.0 / events_per_minute
+    deadline = time.monotonic() + duration
+    published = 0
+    admission_id = None
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        if admission_id is None:
+            conn.request('POST', '/api/admissions', body=json.dumps(fields), headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 201:
+                raise SystemExit(f'Admission failed: {body.decode()}')
+            admission_id = json.loads(body)['id']
+        else:
+            conn.request('POST', f'/api/admissions/{admission_id}/discharge', body='{}', headers=headers)
+            conn.getresponse().read()
+            admission_id = None
+        published += 1
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    if admission_id is not None:
+        conn.request('POST', f'/api/admissions/{admission_id}/discharge', body='{}', headers=headers)
+        conn.getresponse().read()
+    return published
+
+
+def run(port, cookie, fields, clients, duration, events_per_minute, counter):
+    reader = StreamReader()
+    for _ in range(clients):
+        reader.add(open_stream(port, cookie))
+    reader.start()
+    deadline = time.monotonic() + 60
+    while dashboard_events.subscriber_count() < clients and time.monotonic() < deadline:
+        time.sleep(0.1)
+    connected = dashboard_events.subscriber_count()
+
+    counter.reset()
+    published = write_events(port, cookie, fields, events_per_minute, duration)
+    queries = counter.count
+    time.sleep(1)  # let the last events drain
+    reader.close()
+    while dashboard_events.subscriber_count():
+        time.sleep(0.1)
+    return connected, published, reader.delivered, queries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure DB load of the dashboard SSE stream')
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--duration', type=int, default=30, help='seconds per client count')
+    parser.add_argument('--events-per-minute', type=int, default=60)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    # Every client holds two sockets in this process (client and server side)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, 4 * max(args.clients) + 256)), hard))
+
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cookie = login(args.port, args.username, args.password)
+    fields = pick_admission_fields()
+
+    print(f"\nDashboard stream load test ({args.events_per_minute} admissions/discharges per minute)")
+    print("=" * 80)
+    print(f"{'Clients':>8} {'Connected':>10} {'Events':>8} {'Delivered':>10} {'Queries':>8} {'Queries/min':>12}")
+    for clients in args.clients:
+        connected, published, delivered, queries = run(
+            args.port, cookie, fields, clients, args.duration, args.events_per_minute, counter)
+        print(f"{clients:>8} {connected:>10} {published:>8} {delivered:>10} {queries:>8} "
+              f"{queries * 60 / args.duration:>12.1f}")
+    print("=" * 80)
+    server.shutdown()
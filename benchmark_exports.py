@@ -0,0 +1,51 @@
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from exporters import EXPORT_FORMATS, stream_export
+
+# Mirrors the columns of the patient report built by /api/reports/generate
+HEADER = ['Admission ID', 'Patient', 'Department', 'Doctor', 'Admission Type',
+          'Admission Date', 'Discharge Date', 'Fee', 'Status']
+
+
+def synthetic_batches(rows, batch_size):
+    start = datetime(2024, 1, 1)
+    for offset in range(0, rows, batch_size):
+        yield [
+            (i, f'Patient {i}', f'Department {i % 12}', f'dr.doctor{i % 40}', 'Emergency',
+             start + timedelta(minutes=i), start + timedelta(minutes=i, days=3) if i % 4 else None,
+             Decimal(1500 + i % 500), 'Discharged' if i % 4 else 'Active')
+            for i in range(offset, min(offset + batch_size, rows))
+        ]
+
+
+def benchmark(export_format, rows, batch_size):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    for chunk in stream_export(export_format, HEADER, synthetic_batches(rows, batch_size)):
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure report export throughput per format')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--formats', nargs='+', choices=sorted(EXPORT_FORMATS), default=sorted(EXPORT_FORMATS))
+    args = parser.parse_args()
+
+    print(f"\nExporting {args.rows:,} rows in batches of {args.batch_size:,}")
+    print("=" * 70)
+    print(f"{'Format':<8} {'Seconds':>10} {'Rows/sec':>12} {'Output MB':>12} {'Peak MB':>10}")
+    for export_format in args.formats:
+        elapsed, size, peak = benchmark(export_format, args.rows, args.batch_size)
+        print(f"{export_format:<8} {elapsed:>10.2f} {args.rows / elapsed:>12,.0f} "
+              f"{size / 1e6:>12.1f} {peak / 1e6:>10.1f}")
+    print("=" * 70)
@@ -0,0 +1,126 @@
+"""Throughput of ingest_admissions.py at 100k and 1M rows.
+
+Writes a synthetic file of discharged historical admissions that refer to
+existing patients, departments, doctors and admission types, ingests it
+and reports rows/sec. Every row and checkpoint the benchmark creates is
+deleted again afterwards. ``--baseline-rows`` also times the one
+ORM object at a time approach of add_new_admission.py on a small sample.
+
+    python benchmark_ingest.py --rows 100000 1000000
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from database import get_engine, session_scope
+from ingest_admissions import COPY_COLUMNS, ingest
+from models import Admission, AdmissionType, Department, Doctor, Patient
+
+
+def reference_ids():
+    with get_engine().connect() as conn:
+        ids = [conn.execute(text(sql)).scalars().all() for sql in (
+            "SELECT patientid FROM patient ORDER BY patientid LIMIT 5000",
+            "SELECT deptid FROM department",
+            "SELECT admissiontypeid FROM admissiontype",
+            "SELECT username FROM doctordetails"
+        )]
+    if not all(ids):
+        raise SystemExit('Need at least one patient, department, admission type and doctor')
+    return ids
+
+
+def synthetic_rows(rows, refs):
+    patients, departments, types, doctors = refs
+    start = datetime(2015, 1, 1)
+    for i in range(rows):
+        admitted = start + timedelta(minutes=7 * i)
+        yield (types[i % len(types)], departments[i % len(departments)], patients[i % len(patients)],
+               doctors[i % len(doctors)], f'Historical admission {i}',
+               admitted.isoformat(sep=' '), (admitted + timedelta(days=1 + i % 9)).isoformat(sep=' '),
+               f'{500 + i % 4500}.00')
+
+
+def write_file(path, file_format, rows, refs):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(COPY_COLUMNS)
+            writer.writerows(synthetic_rows(rows, refs))
+        else:
+            for row in synthetic_rows(rows, refs):
+                f.write(json.dumps(dict(zip(COPY_COLUMNS, row))) + '\n')
+
+
+def cleanup(first_new_id, source):
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM admission WHERE admissionid > :id"), {'id': first_new_id})
+        conn.execute(text("DELETE FROM ingest_checkpoint WHERE source = :source"), {'source': source})
+
+
+def max_admission_id():
+    with get_engine().connect() as conn:
+        return conn.execute(text("SELECT coalesce(max(admissionid), 0) FROM admission")).scalar()
+
+
+def benchmark_ingest(rows, file_format, batch_size, refs, directory):
+    path = os.path.join(directory, f'admissions_{rows}.{file_format}')
+    write_file(path, file_format, rows, refs)
+    source = f'benchmark:{path}'
+    before = max_admission_id()
+    try:
+        result = ingest(path, file_format, batch_size, os.path.join(directory, 'rejects.ndjson'), source,
+                        restart=True)
+    finally:
+        cleanup(before, source)
+    return result
+
+
+def benchmark_orm(rows, refs):
+    """Per-row lookups and inserts, as add_new_admission.py does"""
+    before = max_admission_id()
+    started = time.perf_counter()
+    with session_scope() as session:
+        for row in synthetic_rows(rows, refs):
+            admission_type, department, patient, doctor, condition, admitted, discharged, fee = row
+            if not (session.get(Patient, patient) and session.get(Department, department)
+                    and session.get(AdmissionType, admission_type) and session.get(Doctor, doctor)):
+                continue
+            session.add(Admission(patient=patient, department=department, admissiontype=admission_type,
+                                  administrator=doctor, condition=condition, admissiondate=admitted,
+                                  dischargedate=discharged, fee=fee))
+            session.commit()
+    elapsed = time.perf_counter() - started
+    cleanup(before, '')
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure bulk admission ingest throughput')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--baseline-rows', type=int, default=0,
+                        help='also time this many rows inserted one ORM object at a time')
+    args = parser.parse_args()
+
+    refs = reference_ids()
+    print(f"\nBulk ingest ({args.format}, batches of {args.batch_size:,})")
+    print("=" * 70)
+    print(f"{'Method':<12} {'Rows':>12} {'Loaded':>12} {'Seconds':>10} {'Rows/sec':>12}")
+    if args.baseline_rows:
+        elapsed = benchmark_orm(args.baseline_rows, refs)
+        print(f"{'orm':<12} {args.baseline_rows:>12,} {args.baseline_rows:>12,} {elapsed:>10.2f} "
+              f"{args.baseline_rows / elapsed:>12,.0f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            result = benchmark_ingest(rows, args.format, args.batch_size, refs, directory)
+            print(f"{'copy':<12} {rows:>12,} {result['loaded']:>12,} {result['seconds']:>10.2f} "
+                  f"{rows / result['seconds']:>12,.0f}")
+    print("=" * 70)
@@ -0,0 +1,104 @@
+"""Latency of /api/patients/search queries (search.search_patients).
+
+Builds queries from a random sample of existing patients: name prefixes as
+typed into a search box, full names, surnames, condition words, surnames
+with a typo and name plus condition. Each query is run once to warm up and
+then timed; the report gives p50/p95/p99 per kind and overall.
+``--baseline`` also times a plain ``ILIKE '%q%'`` lookup of the same
+queries for comparison.
+
+    python benchmark_search.py --samples 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from database import session_scope
+from search import search_patients
+
+
+def sample_patients(session, samples, seed):
+    count, first, last = session.execute(
+        text("SELECT count(*), min(patientid), max(patientid) FROM patient")).one()
+    if not count:
+        raise SystemExit('No patients; run generate_data.py first')
+    rng = random.Random(seed)
+    ids = [rng.randint(first, last) for _ in range(samples * 2)]
+    rows = session.execute(text("SELECT patientname, coalesce(condition, '') FROM patient "
+                                "WHERE patientid = ANY(:ids)"), {'ids': ids}).all()
+    return count, rng, rows[:samples]
+
+
+def typo(rng, word):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:]
+
+
+def build_queries(rng, patients):
+    queries = []
+    for name, condition in patients:
+        words = name.split()
+        condition_words = [w for w in condition.split() if len(w) > 3] or ['care']
+        queries += [
+            ('prefix', name[:rng.randint(2, max(2, len(name) - 1))]),
+            ('full name', name),
+            ('surname', words[-1]),
+            ('condition', condition_words[0][:rng.randint(4, len(condition_words[0]))]),
+            ('typo', typo(rng, words[-1])),
+            ('name + condition', f'{words[0]} {condition_words[0][:5]}'),
+        ]
+    return queries
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def time_queries(session, queries, run):
+    timings = {}
+    for kind, query in queries:
+        run(session, query)
+        started = time.perf_counter()
+        run(session, query)
+        timings.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def ilike(session, query):
+    return session.execute(text("SELECT patientid FROM patient WHERE patientname ILIKE :q LIMIT 10"),
+                           {'q': f'%{query}%'}).all()
+
+
+def print_timings(label, timings):
+    print(f"\n{label}")
+    print(f"{'Query kind':<20} {'Queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    everything = [ms for values in timings.values() for ms in values]
+    for kind, values in list(timings.items()) + [('all', everything)]:
+        print(f"{kind:<20} {len(values):>8} {statistics.median(values):>9.2f} {percentile(values, 0.95):>9.2f} "
+              f"{percentile(values, 0.99):>9.2f} {max(values):>9.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure patient search latency')
+    parser.add_argument('--samples', type=int, default=200, help='patients to build queries from')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', action='store_true', help="also time ILIKE '%%q%%'")
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        count, rng, patients = sample_patients(session, args.samples, args.seed)
+        queries = build_queries(rng, patients)
+        print(f"\nPatient search over {count:,} patients, {len(queries):,} queries, limit {args.limit}")
+        print("=" * 70)
+        print_timings('search_patients', time_queries(
+            session, queries, lambda s, q: search_patients(s, q, args.limit)))
+        if args.baseline:
+            print_timings("ILIKE '%q%'", time_queries(session, queries, ilike))
+        print("=" * 70)
@@ -0,0 +1,104 @@
+"""Startup benchmark: time from interpreter start to the first served request.
+
+Each run happens in a fresh interpreter so nothing is cached between runs.
+Pass ``--compare-ref`` to also time importing config.py as it was at an
+earlier git revision, e.g. ``--compare-ref HEAD~1``.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+CONFIG_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {path!r})
+try:
+    import config
+    print(time.perf_counter() - start)
+except Exception as e:
+    print('error', type(e).__name__, str(e).splitlines()[0])
+"""
+
+APP_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {path!r})
+import config
+from app import app
+imported = time.perf_counter()
+response = app.test_client().get('/health/live')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(imported - start, served - start)
+"""
+
+
+def run_snippet(snippet, path):
+    result = subprocess.run([sys.executable, '-c', snippet.format(path=path)],
+                            capture_output=True, text=True, cwd=path)
+    if result.returncode != 0:
+        return ['error', result.stderr.strip().splitlines()[-1]]
+    return result.stdout.split()
+
+
+def summarize(samples):
+    if samples and samples[0] == 'error':
+        return 'failed: ' + ' '.join(samples[1:])
+    return f"median {statistics.median(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms"
+
+
+def time_config(path, runs):
+    samples = []
+    for _ in range(runs):
+        output = run_snippet(CONFIG_SNIPPET, path)
+        if output[0] == 'error':
+            return output
+        samples.append(float(output[0]))
+    return samples
+
+
+def time_app(runs):
+    imported, served = [], []
+    for _ in range(runs):
+        output = run_snippet(APP_SNIPPET, ROOT)
+        if output[0] == 'error':
+            return output, output
+        imported.append(float(output[0]))
+        served.append(float(output[1]))
+    return imported, served
+
+
+def config_at_ref(ref, directory):
+    source = subprocess.run(['git', 'show', f'{ref}:config.py'], capture_output=True,
+                            text=True, cwd=ROOT, check=True).stdout
+    with open(os.path.join(directory, 'config.py'), 'w') as f:
+        f.write(source)
+    # The old module reads the same .env
+    if os.path.exists(os.path.join(ROOT, '.env')):
+        with open(os.path.join(ROOT, '.env')) as src, open(os.path.join(directory, '.env'), 'w') as dst:
+            dst.write(src.read())
+    return directory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure import-to-first-request time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--compare-ref', help='git revision whose config.py to time as well')
+    args = parser.parse_args()
+
+    print(f"\nStartup timings over {args.runs} fresh interpreters")
+    print("=" * 80)
+    print(f"{'import config':<32} {summarize(time_config(ROOT, args.runs))}")
+    if args.compare_ref:
+        with tempfile.TemporaryDirectory() as directory:
+            old = time_config(config_at_ref(args.compare_ref, directory), args.runs)
+        print(f"{'import config @ ' + args.compare_ref:<32} {summarize(old)}")
+    imported, served = time_app(args.runs)
+    print(f"{'import app':<32} {summarize(imported)}")
+    print(f"{'import to first request':<32} {summarize(served)}")
+    print("=" * 80)
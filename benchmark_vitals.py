@@ -0,0 +1,99 @@
+"""Latency of vitals queries for a long, densely monitored stay.
+
+Adds one Intensive Care admission with a reading every minute for 30 days
+(43,200 rows) to an existing patient, times the queries behind
+/api/admissions/<id>/details and /api/admissions/<id>/vitals against it,
+and rolls everything back unless ``--keep`` is given. ``legacy`` is the
+old details endpoint: every reading of the admission through the ORM with
+a doctor lookup per row.
+
+    python benchmark_vitals.py --days 30 --interval 1
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from database import session_scope
+from models import AdmissionDetails, Doctor
+from vitals import buckets, readings
+
+CREATE_ADMISSION_SQL = """
+    INSERT INTO admission (admissiontype, department, patient, administrator, condition, admissiondate, fee)
+    SELECT (SELECT admissiontypeid FROM admissiontype ORDER BY admissiontypename = 'Intensive Care' DESC LIMIT 1),
+           (SELECT min(deptid) FROM department), (SELECT min(patientid) FROM patient),
+           (SELECT min(username) FROM doctordetails), 'Vitals benchmark', now() - make_interval(days => :days), 0
+    RETURNING admissionid, admissiondate, administrator
+"""
+
+FILL_SQL = """
+    INSERT INTO admissiondetails (admissionid, timestamp, temperature, blood_pressure, pulse_rate, recorded_by)
+    SELECT :admission_id, :admitted + n * make_interval(mins => :interval),
+           round((37 + random())::numeric, 1),
+           (110 + (random() * 30)::int) || '/' || (70 + (random() * 20)::int),
+           70 + (random() * 40)::int, :doctor
+    FROM generate_series(0, :readings - 1) AS n
+"""
+
+
+def legacy(session, admission_id):
+    result = []
+    for detail in session.query(AdmissionDetails).filter_by(admissionid=admission_id)\
+            .order_by(AdmissionDetails.timestamp.desc()).all():
+        doctor = session.get(Doctor, detail.recorded_by)
+        result.append((detail.detailid, doctor.doctorname if doctor else None))
+    return result
+
+
+def time_call(fn, repeat):
+    fn()
+    timings, rows = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        rows = len(result[0] if isinstance(result, tuple) else result)
+    return rows, timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure vitals query latency on a long ICU stay')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--interval', type=int, default=1, help='minutes between readings')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='commit the benchmark admission')
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        total = args.days * 24 * 60 // args.interval
+        started = time.perf_counter()
+        admission_id, admitted, doctor = session.execute(text(CREATE_ADMISSION_SQL), {'days': args.days}).one()
+        session.execute(text(FILL_SQL), {'admission_id': admission_id, 'admitted': admitted,
+                                         'interval': args.interval, 'readings': total, 'doctor': doctor})
+        session.execute(text("ANALYZE admissiondetails"))
+        print(f"\nAdmission {admission_id}: {total:,} readings over {args.days} days "
+              f"(inserted in {time.perf_counter() - started:.1f}s)")
+        print("=" * 70)
+
+        end = admitted + timedelta(days=args.days)
+        last_day = end - timedelta(days=1)
+        cases = [
+            ('legacy: all readings + doctor per row', lambda: legacy(session, admission_id)),
+            ('details: latest 200', lambda: readings(session, admission_id, limit=200, newest_first=True)),
+            ('raw: 6 hours, page of 500', lambda: readings(
+                session, admission_id, end - timedelta(hours=6), end, limit=500)),
+            ('buckets: last day at 5 min', lambda: buckets(session, admission_id, last_day, end, 300)),
+            ('buckets: whole stay at 1 hour', lambda: buckets(session, admission_id, admitted, end, 3600)),
+            ('buckets: whole stay at 3 hours', lambda: buckets(session, admission_id, admitted, end, 3 * 3600)),
+            ('buckets: whole stay at 1 day', lambda: buckets(session, admission_id, admitted, end, 86400)),
+        ]
+        print(f"{'Query':<40} {'Rows':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for label, fn in cases:
+            rows, timings = time_call(fn, args.repeat)
+            print(f"{label:<40} {rows:>7} {statistics.median(timings):>9.2f} "
+                  f"{sorted(timings)[int(0.95 * (len(timings) - 1))]:>9.2f} {max(timings):>9.2f}")
+        print("=" * 70)
+        if args.keep:
+            session.commit()
@@ -0,0 +1,58 @@
+import json
+import queue
+import threading
+
+
+def format_sse(event, data):
+    """Encode one Server-Sent Events message"""
+    payload = json.dumps(data, separators=(',', ':'))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class Broadcaster:
+    """In-process fan-out of events to streaming subscribers.
+
+    Each message is serialized once in ``publish`` and the same string is
+    handed to every subscriber queue, so the cost of an event does not grow
+    with the number of connected clients beyond a queue put. A subscriber
+    that falls more than ``queue_size`` messages behind has its backlog
+    replaced by a single ``resync`` event telling it to reload.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(message)
+            except queue.Full:
+                self._resync(subscription)
+        return len(subscribers)
+
+    def _resync(self, subscription):
+        try:
+            while True:
+                subscription.get_nowait()
+        except queue.Empty:
+            pass
+        subscription.put_nowait(format_sse('resync', {}))
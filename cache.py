@@ -0,0 +1,164 @@
+"""Response cache with pluggable backends.
+
+Values are opaque bytes (serialized response bodies) stored under short
+string keys with a per-key TTL. ``MemoryBackend`` keeps them in the current
+process with LRU eviction; ``RedisBackend`` talks to any Redis-compatible
+server (Redis, Valkey, KeyDB) so every web process shares one cache and
+sees the same invalidations. A ``fakeredis://`` URL gives the Redis backend
+an in-process fakeredis server instead, for development and tests without a
+Redis server (``pip install fakeredis``); it is not shared between processes.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-key expiry"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Cache stored in a Redis-compatible server.
+
+    Expiry uses ``SET ... EX``; LRU eviction is left to the server's
+    ``maxmemory-policy`` (``allkeys-lru`` or ``volatile-lru``).
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix='hms:cache:'):
+        self._client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix='hms:cache:'):
+        if url.startswith('fakeredis://'):
+            try:
+                import fakeredis
+            except ImportError as e:
+                raise RuntimeError("fakeredis:// cache URLs require the 'fakeredis' package") from e
+            return cls(fakeredis.FakeRedis(), prefix=prefix)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend requires the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self._client.delete(*keys)
+
+
+class ResponseCache:
+    """Front end over a backend that counts hits and misses per key.
+
+    Backend errors are logged and treated as misses, so an unreachable cache
+    server slows requests down instead of failing them.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, key, field):
+        with self._lock:
+            counters = self._counters.setdefault(key, {'hits': 0, 'misses': 0, 'invalidations': 0})
+            counters[field] += 1
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed for {key}: {e}")
+            value = None
+        self._count(key, 'misses' if value is None else 'hits')
+        return value
+
+    def set(self, key, value, ttl):
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    def invalidate(self, *keys):
+        try:
+            self.backend.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for {', '.join(keys)}: {e}")
+        for key in keys:
+            self._count(key, 'invalidations')
+
+    def stats(self):
+        """Hit/miss counters for this process, per key and in total"""
+        with self._lock:
+            keys = {key: dict(counters) for key, counters in self._counters.items()}
+        hits = sum(counters['hits'] for counters in keys.values())
+        misses = sum(counters['misses'] for counters in keys.values())
+        for counters in keys.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+        return {
+            'backend': self.backend.name,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            'keys': keys
+        }
+
+
+def create_backend(name, url=None, max_entries=1024):
+    if name == 'memory':
+        return MemoryBackend(max_entries=max_entries)
+    if name == 'redis':
+        return RedisBackend.from_url(url or 'redis://localhost:6379/0')
+    raise ValueError(f"Unknown cache backend: {name}")
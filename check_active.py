@@ -1,10 +1,13 @@
-from app import app, db, Patient, Admission, Department, Doctor, AdmissionType
+from sqlalchemy import func
+
+from database import session_scope
+from models import Patient, Admission, Department, Doctor, AdmissionType
 
 def check_active_admissions():
-    with app.app_context():
+    with session_scope() as session:
         try:
             active_admissions = (
-                db.session.query(
+                session.query(
                     Admission, Patient, Department, Doctor, AdmissionType
                 )
                 .join(Patient, Admission.patient == Patient.patientid)
@@ -33,9 +36,9 @@ def check_active_admissions():
             print("\nDepartment-wise Active Patients:")
             print("=" * 50)
             dept_stats = (
-                db.session.query(
+                session.query(
                     Department.deptname,
-                    db.func.count(Admission.admissionid).label('active_count')
+                    func.count(Admission.admissionid).label('active_count')
                 )
                 .join(Admission, Department.deptid == Admission.department)
                 .filter(Admission.dischargedate == None)
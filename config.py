@@ -1,64 +1,53 @@
 import os
 from dotenv import load_dotenv
-import logging
-import psycopg2
-from psycopg2 import OperationalError
-
-logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-def test_db_connection(database_url):
-    """Test the database connection"""
-    try:
-        # Extract connection parameters from DATABASE_URL
-        db_params = database_url.replace('postgresql://', '')
-        user_pass, host_db = db_params.split('@')
-        user, password = user_pass.split(':')
-        host_port, db_name = host_db.split('/')
-        host = host_port.split(':')[0]
-        port = host_port.split(':')[1] if ':' in host_port else '5432'
+# Nothing in this module touches the network: the database is only contacted
+# when the app first needs it, or by the readiness probe (see readiness.py).
+# SQLAlchemy is imported inside the helpers to keep this import cheap.
 
-        # Try to connect
-        conn = psycopg2.connect(
-            dbname=db_name,
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        conn.close()
-        logger.info("Database connection test successful")
-        return True
-    except OperationalError as e:
-        logger.error(f"Database connection failed: {str(e)}")
-        return False
+def require_database_url(database_url=None):
+    """Return the database URL, raising if it is missing or malformed"""
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.exc import ArgumentError
+    database_url = database_url or os.getenv('DATABASE_URL')
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable is required")
+    try:
+        make_url(database_url)
+    except ArgumentError as e:
+        raise ValueError(f"Invalid DATABASE_URL: {str(e)}") from e
+    return database_url
+
+def masked_database_url(database_url):
+    """The database URL with its password hidden, for logging"""
+    from sqlalchemy.engine import make_url
+    return make_url(database_url).render_as_string(hide_password=True)
+
+def env_flag(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
 
 class Config:
-    # Get database URL from environment variable
+    # Get database URL from environment variable; validated when the app is created
     DATABASE_URL = os.getenv('DATABASE_URL')
-    if not DATABASE_URL:
-        logger.error("DATABASE_URL not found in environment variables")
-        raise ValueError("DATABASE_URL environment variable is required")
-
-    # Test database connection
-    if not test_db_connection(DATABASE_URL):
-        raise ValueError("Could not connect to the database. Please check your connection settings.")
-
-    # Log the database URL (with password masked)
-    masked_url = DATABASE_URL.replace(DATABASE_URL.split(':')[2].split('@')[0], '****')
-    logger.info("Using database URL: %s", masked_url)
 
     # Flask configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True  # Enable SQL query logging
+    SQLALCHEMY_ECHO = env_flag('SQLALCHEMY_ECHO', False)  # Log every SQL query
     
-    # Pool configuration
+    # Pool configuration, applied by database.engine_options()
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'pool_recycle': 3600,
-        'pool_pre_ping': True
-    } 
\ No newline at end of file
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),  # Seconds to wait for a free connection
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '3600')),
+        'pool_pre_ping': env_flag('DB_POOL_PRE_PING', True)
+    }
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))  # 0 disables the timeout
@@ -0,0 +1,156 @@
+"""Engine construction and a DB-only session factory.
+
+``engine_options`` turns the pool settings in ``Config`` into engine keyword
+arguments; the Flask app (``create_app``) and scripts share it so both get
+the same pool size, timeouts and checkout metrics. Scripts that only need
+the database use ``session_scope`` with the mapped classes from models.py
+instead of importing and building the whole Flask app:
+
+    from database import session_scope
+    from models import Patient
+
+    with session_scope() as session:
+        print(session.query(Patient).count())
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from config import Config, require_database_url
+
+
+class PoolMetrics:
+    """Histogram of how long connection checkouts waited for the pool"""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self._bucket_counts[i] += 1
+                    break
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        """Counters plus cumulative bucket counts (``le`` semantics)"""
+        with self._lock:
+            cumulative, running = [], 0
+            for bound, count in zip(self.BUCKETS, self._bucket_counts):
+                running += count
+                cumulative.append((bound, running))
+            return {
+                'checkouts': self.count,
+                'wait_seconds_total': round(self.total_seconds, 6),
+                'wait_seconds_max': round(self.max_seconds, 6),
+                'wait_seconds_avg': round(self.total_seconds / self.count, 6) if self.count else 0.0,
+                'timeouts': self.timeouts,
+                'buckets': cumulative
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout took, including time
+    spent waiting for a connection to be returned or opened."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.observe(time.perf_counter() - started)
+
+
+def pool_status(engine):
+    """Current occupancy of ``engine``'s pool"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(0, pool.overflow()),
+        'idle': pool.checkedin()
+    }
+
+
+def engine_options(options=None, statement_timeout_ms=None):
+    """Engine keyword arguments for ``options`` (``SQLALCHEMY_ENGINE_OPTIONS``).
+
+    Adds the timed pool and, for PostgreSQL, a per-connection
+    ``statement_timeout`` in milliseconds.
+    """
+    options = dict(Config.SQLALCHEMY_ENGINE_OPTIONS if options is None else options)
+    options.setdefault('poolclass', TimedQueuePool)
+    if statement_timeout_ms is None:
+        statement_timeout_ms = Config.DB_STATEMENT_TIMEOUT_MS
+    if statement_timeout_ms:
+        connect_args = dict(options.get('connect_args', {}))
+        connect_args.setdefault('options', f'-c statement_timeout={int(statement_timeout_ms)}')
+        options['connect_args'] = connect_args
+    return options
+
+
+_engine = None
+_session_factory = None
+_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine for scripts, created on first use from ``DATABASE_URL``"""
+    global _engine
+    with _lock:
+        if _engine is None:
+            _engine = create_engine(require_database_url(Config.SQLALCHEMY_DATABASE_URI),
+                                    **engine_options())
+        return _engine
+
+
+def get_session_factory():
+    global _session_factory
+    engine = get_engine()
+    with _lock:
+        if _session_factory is None:
+            _session_factory = sessionmaker(bind=engine)
+        return _session_factory
+
+
+@contextmanager
+def session_scope():
+    """A session that is rolled back on error and always closed.
+
+    Commits are left to the caller, as in the request handlers.
+    """
+    session = get_session_factory()()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,200 @@
+"""Per-department report for a date range.
+
+Everything but the live occupancy (which the app takes from its occupancy
+index) comes from one statement: the department's admissions in the range
+are grouped with GROUPING SETS into the overall totals, the admission type
+mix, the per-doctor figures and the length-of-stay distribution, so the
+cost is one index range scan on (department, admissiondate) whatever the
+range. Stays are counted for the admissions made in the range, as in the
+other reports.
+
+The rendered PDF is stored under the SHA-256 of the report's content
+(``digest``), so a download of a report that has already been rendered is
+a file read, and an unchanged report is never rendered twice:
+
+    python department_report.py 3 --start 2024-01-01 --end 2024-03-31
+"""
+import argparse
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from exporters import stream_pdf_sections
+
+DEFAULT_DAYS = 30
+TOP_DOCTORS = 5
+
+# Upper bounds (days) of the length-of-stay buckets; the last one is open
+STAY_BUCKETS = [1, 3, 7, 14, 30]
+STAY_LABELS = ['< 1 day', '1-2 days', '3-6 days', '7-13 days', '14-29 days', '30+ days']
+
+REPORT_SQL = f"""
+    WITH scoped AS (
+        SELECT coalesce(t.admissiontypename, 'Unknown') AS type_name,
+               a.administrator, coalesce(d.doctorname, a.administrator, 'Unassigned') AS doctor_name,
+               coalesce(a.fee, 0) AS fee, a.dischargedate,
+               extract(epoch FROM a.dischargedate - a.admissiondate) / 86400 AS stay_days
+        FROM admission a
+        LEFT JOIN admissiontype t ON t.admissiontypeid = a.admissiontype
+        LEFT JOIN doctordetails d ON d.username = a.administrator
+        WHERE a.department = :department AND a.admissiondate >= :start AND a.admissiondate < :end
+    )
+    SELECT CASE WHEN grouping(type_name) = 0 THEN 'type'
+                WHEN grouping(administrator) = 0 THEN 'doctor'
+                WHEN grouping(width_bucket(stay_days, ARRAY{STAY_BUCKETS}::numeric[])) = 0 THEN 'stay'
+                ELSE 'total' END AS section,
+           coalesce(type_name, doctor_name) AS name,
+           width_bucket(stay_days, ARRAY{STAY_BUCKETS}::numeric[]) AS stay_bucket,
+           count(*) AS admissions,
+           count(dischargedate) AS discharged,
+           sum(fee) AS revenue,
+           avg(stay_days) AS avg_stay,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY stay_days) AS median_stay,
+           percentile_cont(0.9) WITHIN GROUP (ORDER BY stay_days) AS p90_stay,
+           count(DISTINCT administrator) AS doctors
+    FROM scoped
+    GROUP BY GROUPING SETS (
+        (), (type_name), (administrator, doctor_name),
+        (width_bucket(stay_days, ARRAY{STAY_BUCKETS}::numeric[]))
+    )
+"""
+
+
+def report_window(start_date=None, end_date=None, days=DEFAULT_DAYS):
+    """Half-open ``[start, end)`` for inclusive ``YYYY-MM-DD`` dates; the
+    last ``days`` days up to today by default"""
+    end = (datetime.strptime(end_date, '%Y-%m-%d') if end_date
+           else datetime.combine(datetime.utcnow().date(), datetime.min.time())) + timedelta(days=1)
+    start = datetime.strptime(start_date, '%Y-%m-%d') if start_date else end - timedelta(days=days)
+    if start >= end:
+        raise ValueError('start_date must not be after end_date')
+    return start, end
+
+
+def _days(value):
+    return round(float(value), 1) if value is not None else 0.0
+
+
+def _percent(part, whole):
+    return round(part * 100 / whole, 1) if whole else 0.0
+
+
+def build_report(session, department, start, end):
+    """Admissions, revenue, stays, type mix and top doctors of
+    ``department`` (a dict with id, name, capacity and active) for
+    admissions made in ``[start, end)``"""
+    rows = session.execute(text(REPORT_SQL), {
+        'department': department['id'], 'start': start, 'end': end}).all()
+    total = next(row for row in rows if row.section == 'total')
+    revenue = float(total.revenue or 0)
+
+    stays = {row.stay_bucket: row.admissions for row in rows
+             if row.section == 'stay' and row.stay_bucket is not None}
+    admission_types = sorted((row for row in rows if row.section == 'type'),
+                             key=lambda row: (-row.admissions, row.name))
+    doctors = sorted((row for row in rows if row.section == 'doctor'),
+                     key=lambda row: (-row.admissions, row.name))[:TOP_DOCTORS]
+
+    return {
+        'id': department['id'],
+        'name': department['name'],
+        'start_date': start.date().isoformat(),
+        'end_date': (end - timedelta(days=1)).date().isoformat(),
+        'capacity': department['capacity'],
+        'active_patients': department['active'],
+        'occupancy': _percent(department['active'], department['capacity']),
+        'total_staff': total.doctors,
+        'total_admissions': total.admissions,
+        'discharged_patients': total.discharged,
+        'current_patients': total.admissions - total.discharged,
+        'avg_stay_duration': _days(total.avg_stay),
+        'median_stay_duration': _days(total.median_stay),
+        'p90_stay_duration': _days(total.p90_stay),
+        'revenue': revenue,
+        'avg_patient_cost': round(revenue / total.admissions, 2) if total.admissions else 0.0,
+        'stay_distribution': [{
+            'label': label,
+            'count': stays.get(bucket, 0),
+            'percent': _percent(stays.get(bucket, 0), total.discharged)
+        } for bucket, label in enumerate(STAY_LABELS)],
+        'admission_types': [{
+            'name': row.name,
+            'count': row.admissions,
+            'percent': _percent(row.admissions, total.admissions),
+            'discharged_percent': _percent(row.discharged, row.admissions),
+            'avg_stay_days': _days(row.avg_stay)
+        } for row in admission_types],
+        'top_doctors': [{
+            'name': row.name,
+            'admissions': row.admissions,
+            'revenue': float(row.revenue or 0),
+            'avg_stay_days': _days(row.avg_stay)
+        } for row in doctors],
+    }
+
+
+def report_digest(report):
+    """Content address of a report: the same figures give the same digest"""
+    payload = json.dumps(report, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_pdf(report):
+    """Yield the report as a PDF in chunks"""
+    title = f"{report['name']} department report ({report['start_date']} to {report['end_date']})"
+    return stream_pdf_sections(title, [
+        ('Overview', ['Metric', 'Value'], [
+            ['Active patients', report['active_patients']],
+            ['Beds', report['capacity']],
+            ['Occupancy %', report['occupancy']],
+            ['Doctors admitting', report['total_staff']],
+        ]),
+        ('Admissions', ['Metric', 'Value'], [
+            ['Admissions', report['total_admissions']],
+            ['Discharged', report['discharged_patients']],
+            ['Still admitted', report['current_patients']],
+            ['Average stay (days)', report['avg_stay_duration']],
+            ['Median stay (days)', report['median_stay_duration']],
+            ['90th percentile stay (days)', report['p90_stay_duration']],
+            ['Revenue', f"{report['revenue']:.2f}"],
+            ['Average fee', f"{report['avg_patient_cost']:.2f}"],
+        ]),
+        ('Length of stay (discharged admissions)', ['Stay', 'Admissions', '%'],
+         [[bucket['label'], bucket['count'], bucket['percent']] for bucket in report['stay_distribution']]),
+        ('Admission types', ['Type', 'Admissions', '%', 'Discharged %', 'Avg stay (days)'],
+         [[t['name'], t['count'], t['percent'], t['discharged_percent'], t['avg_stay_days']]
+          for t in report['admission_types']]),
+        ('Top doctors', ['Doctor', 'Admissions', 'Revenue', 'Avg stay (days)'],
+         [[d['name'], d['admissions'], f"{d['revenue']:.2f}", d['avg_stay_days']]
+          for d in report['top_doctors']]),
+    ])
+
+
+if __name__ == '__main__':
+    from database import session_scope
+
+    parser = argparse.ArgumentParser(description='Print a department report')
+    parser.add_argument('department', type=int)
+    parser.add_argument('--start', help='first day, YYYY-MM-DD')
+    parser.add_argument('--end', help='last day, YYYY-MM-DD')
+    parser.add_argument('--pdf', help='also write the PDF to this file')
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        department = session.execute(text("""
+            SELECT d.deptid AS id, d.deptname AS name, coalesce(c.beds, 0) AS capacity,
+                   (SELECT count(*) FROM admission WHERE department = d.deptid AND dischargedate IS NULL) AS active
+            FROM department d LEFT JOIN department_capacity c ON c.deptid = d.deptid
+            WHERE d.deptid = :department
+        """), {'department': args.department}).mappings().first()
+        if department is None:
+            raise SystemExit(f'No department {args.department}')
+        start, end = report_window(args.start, args.end)
+        report = build_report(session, dict(department), start, end)
+    print(json.dumps(report, indent=2))
+    if args.pdf:
+        with open(args.pdf, 'wb') as out:
+            for chunk in render_pdf(report):
+                out.write(chunk)
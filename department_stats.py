@@ -0,0 +1,136 @@
+"""Per-department totals as a PostgreSQL materialized view.
+
+``department_stats`` holds, per department, its admissions and the
+discharged ones, total and this month's revenue and the average stay of
+discharged admissions, with ``refreshed_at``, the time it was computed.
+The department pages, statistics and reports read it instead of
+aggregating the admission table on every request, and report
+``refreshed_at`` as how current the figures are. Active patients are not
+in it: the app's occupancy index has them up to date.
+
+The unique index on ``deptid`` lets the view be refreshed CONCURRENTLY,
+so readers are never blocked by a refresh. ``RefreshScheduler`` refreshes
+it in a background thread every ``interval`` seconds, or sooner once
+``write_threshold`` admission writes have been recorded; an advisory lock
+keeps several processes from refreshing at the same time. To refresh by
+hand (e.g. after a bulk load):
+
+    python department_stats.py --refresh
+"""
+import argparse
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+VIEW_SQL = """
+    SELECT d.deptid,
+           count(a.admissionid) AS total_admissions,
+           count(a.dischargedate) AS discharged_patients,
+           coalesce(sum(a.fee), 0) AS total_revenue,
+           coalesce(sum(a.fee) FILTER (WHERE a.admissiondate >= date_trunc('month', now())), 0) AS monthly_revenue,
+           round(avg(extract(epoch FROM a.dischargedate - a.admissiondate)) / 86400, 2) AS avg_stay_days,
+           now() AS refreshed_at
+    FROM department d
+    LEFT JOIN admission a ON a.department = d.deptid
+    GROUP BY d.deptid
+"""
+
+CREATE_VIEW = [
+    f"CREATE MATERIALIZED VIEW IF NOT EXISTS department_stats AS {VIEW_SQL}",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_department_stats_deptid ON department_stats (deptid)",
+]
+DROP_VIEW = "DROP MATERIALIZED VIEW IF EXISTS department_stats"
+
+# Arbitrary key of the advisory lock held while refreshing
+REFRESH_LOCK = 7252024
+
+
+def create_view(connection):
+    for statement in CREATE_VIEW:
+        connection.execute(text(statement))
+
+
+def refresh(engine):
+    """Refresh the view CONCURRENTLY unless another process is already
+    doing so; returns whether this call refreshed it"""
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {'key': REFRESH_LOCK}).scalar():
+            return False
+        try:
+            conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY department_stats"))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': REFRESH_LOCK})
+    return True
+
+
+class RefreshScheduler:
+    """Runs ``refresh`` in a daemon thread every ``interval`` seconds, or as
+    soon as ``record_write`` has been called ``write_threshold`` times since
+    the last refresh.
+
+    The thread is only started by ``start``, so importing the app from
+    scripts or migrations never starts it.
+    """
+
+    def __init__(self, refresh, interval=60, write_threshold=100):
+        self.refresh = refresh
+        self.interval = interval
+        self.write_threshold = write_threshold
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._writes = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='department-stats-refresh', daemon=True)
+        self._thread.start()
+
+    def record_write(self, count=1):
+        with self._lock:
+            self._writes += count
+            due = self.write_threshold and self._writes >= self.write_threshold
+        if due:
+            self._wake.set()
+
+    def run(self):
+        """Refresh now; errors are logged, not raised"""
+        with self._lock:
+            writes, self._writes = self._writes, 0
+        try:
+            started = time.perf_counter()
+            if self.refresh():
+                logger.debug(f"department_stats refreshed in {time.perf_counter() - started:.2f}s "
+                             f"after {writes} writes")
+        except Exception as e:
+            with self._lock:
+                self._writes += writes
+            logger.error(f"Refreshing department_stats failed: {e}")
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.run()
+
+
+if __name__ == '__main__':
+    from database import get_engine
+
+    parser = argparse.ArgumentParser(description='Create or refresh the department_stats materialized view')
+    parser.add_argument('--refresh', action='store_true', help='refresh the view (creating it if missing)')
+    args = parser.parse_args()
+
+    engine = get_engine()
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        create_view(conn)
+    if args.refresh:
+        refresh(engine)
+    print(f"department_stats ready in {time.perf_counter() - started:.1f}s")
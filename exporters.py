@@ -0,0 +1,241 @@
+"""Streaming report writers.
+
+Each writer takes a header row and an iterable of row batches and yields the
+encoded file in chunks, so an export never holds more than one batch of rows
+(plus one PDF page) in memory. Only the standard library is used.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    return str(value)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are collected and drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_csv(header, batches):
+    sink = io.StringIO()
+    writer = csv.writer(sink)
+    writer.writerow(header)
+    for batch in batches:
+        writer.writerows([_cell_text(value) for value in row] for row in batch)
+        yield sink.getvalue().encode('utf-8')
+        sink.seek(0)
+        sink.truncate()
+    if sink.tell():
+        yield sink.getvalue().encode('utf-8')
+
+
+# Strips characters that are not allowed in XML 1.0 documents
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_XML_INVALID.sub('', _cell_text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>'
+
+
+def stream_xlsx(header, batches, sheet_name='Report'):
+    """Write a single-sheet workbook using inline strings.
+
+    zipfile supports unseekable outputs by emitting data descriptors, which
+    lets the worksheet be compressed and flushed batch by batch.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        workbook.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                         '<sheetData>' + _xlsx_row(header)).encode('utf-8'))
+            for batch in batches:
+                sheet.write(''.join(_xlsx_row(row) for row in batch).encode('utf-8'))
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT = 842, 595  # A4 landscape, in points
+PDF_FONT_SIZE = 7
+PDF_LEADING = 9
+PDF_MARGIN = 30
+PDF_LINES_PER_PAGE = (PDF_PAGE_HEIGHT - 2 * PDF_MARGIN) // PDF_LEADING
+PDF_LINE_CHARS = int((PDF_PAGE_WIDTH - 2 * PDF_MARGIN) / (PDF_FONT_SIZE * 0.6))  # Courier glyphs are 0.6em wide
+
+
+def _pdf_text(line):
+    line = line.encode('latin-1', 'replace').decode('latin-1')
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_columns(header):
+    width = max(4, (PDF_LINE_CHARS - len(header)) // len(header))
+    return lambda row: ' '.join(_cell_text(value)[:width].ljust(width) for value in row)
+
+
+def _stream_pdf_lines(batches, page_header):
+    """Write batches of text lines as PDF pages in a monospaced font,
+    repeating ``page_header`` at the top of every page.
+
+    Pages are emitted as soon as they fill up; only the byte offsets needed
+    for the cross-reference table are kept until the end.
+    """
+    offsets = {}
+    page_ids = []
+    position = 0
+    # Objects 1-3 are the catalog, page tree and font; pages start at 4
+    next_id = 4
+
+    def emit(obj_id, body):
+        nonlocal position
+        data = f'{obj_id} 0 obj\n'.encode('latin-1') + body + b'\nendobj\n'
+        offsets[obj_id] = position
+        position += len(data)
+        return data
+
+    def page(lines):
+        nonlocal next_id
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        text = '\n'.join(f'({_pdf_text(line)}) Tj T*' for line in lines)
+        stream = (f'BT /F1 {PDF_FONT_SIZE} Tf {PDF_LEADING} TL '
+                  f'{PDF_MARGIN} {PDF_PAGE_HEIGHT - PDF_MARGIN} Td\n{text}\nET').encode('latin-1')
+        return (emit(page_id, (f'<< /Type /Page /Parent 2 0 R /Contents {content_id} 0 R '
+                               f'/Resources << /Font << /F1 3 0 R >> >> >>').encode('latin-1')) +
+                emit(content_id, f'<< /Length {len(stream)} >>\nstream\n'.encode('latin-1') +
+                     stream + b'\nendstream'))
+
+    head = b'%PDF-1.4\n'
+    position = len(head)
+    yield head + emit(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+
+    lines = list(page_header)
+    for batch in batches:
+        output = []
+        for line in batch:
+            lines.append(line)
+            if len(lines) >= PDF_LINES_PER_PAGE:
+                output.append(page(lines))
+                lines = list(page_header)
+        if output:
+            yield b''.join(output)
+    if len(lines) > len(page_header) or not page_ids:
+        yield page(lines)
+
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    tail = emit(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} '
+                   f'/MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] >>'.encode('latin-1'))
+    tail += emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    xref_position = position
+    xref = [f'xref\n0 {next_id}\n', '0000000000 65535 f \n']
+    xref += [f'{offsets[obj_id]:010d} 00000 n \n' for obj_id in range(1, next_id)]
+    yield tail + ''.join(xref).encode('latin-1') + (
+        f'trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n').encode('latin-1')
+
+
+def stream_pdf(header, batches, title='Report'):
+    """Write a plain tabular PDF, the header repeated on every page"""
+    format_row = _pdf_columns(header)
+    return _stream_pdf_lines(([format_row(row) for row in batch] for batch in batches),
+                             [title, '', format_row(header), '-' * PDF_LINE_CHARS])
+
+
+def stream_pdf_sections(title, sections):
+    """Write a short PDF of small tables given as ``(heading, header, rows)``"""
+    lines = []
+    for heading, header, rows in sections:
+        format_row = _pdf_columns(header)
+        lines += [heading, format_row(header), '-' * PDF_LINE_CHARS]
+        lines += [format_row(row) for row in rows]
+        lines.append('')
+    return _stream_pdf_lines([lines], [title, ''])
+
+
+def stream_export(export_format, header, batches, title='Report'):
+    if export_format == 'csv':
+        return stream_csv(header, batches)
+    if export_format == 'excel':
+        return stream_xlsx(header, batches, sheet_name=title)
+    if export_format == 'pdf':
+        return stream_pdf(header, batches, title=title)
+    raise ValueError(f"Unsupported export format: {export_format}")
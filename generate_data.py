@@ -0,0 +1,368 @@
+"""Deterministic synthetic hospital data for development and load tests.
+
+    python generate_data.py --seed 7 --patients 50000 --years 3 --admissions-per-day 80
+
+The same seed, options and ``--end-date`` always produce the same
+departments, doctors, patients, admissions, vitals (admissiondetails) and
+medical_details. Only the database IDs depend on what is already in the
+tables. Admissions follow a seasonal and weekly arrival pattern. Each
+admission type has its own length of stay, fee and vitals interval. An
+admission that would still be running at the end date is left active.
+Rows are written with COPY in batches and counted into
+daily_admission_rollup as they go. Existing departments, admission
+types and doctor usernames are reused rather than duplicated, and
+``--reset`` empties the hospital tables first.
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from database import get_engine
+from ingest_admissions import copy_rows
+from rollup import batch_sql
+from search import words_sql
+
+# name, base beds, typical conditions
+DEPARTMENTS = [
+    ('Cardiology', 40, ['Hypertension and chest pain', 'Cardiac arrhythmia', 'Heart failure', 'Myocardial infarction']),
+    ('Orthopedics', 35, ['Fractured femur', 'Knee replacement', 'Hip replacement', 'Spinal stenosis']),
+    ('Pediatrics', 30, ['Bronchiolitis', 'Gastroenteritis', 'Asthma exacerbation', 'Febrile seizure']),
+    ('Neurology', 25, ['Stroke', 'Migraine and vertigo', 'Epilepsy', 'Multiple sclerosis relapse']),
+    ('Emergency', 50, ['Acute appendicitis', 'Trauma', 'Severe dehydration', 'Allergic reaction']),
+    ('Internal Medicine', 45, ['Type 2 Diabetes', 'Pneumonia', 'Sepsis', 'Kidney infection']),
+    ('Surgery', 40, ['Gallbladder removal', 'Hernia repair', 'Bowel obstruction', 'Post-surgery recovery']),
+    ('Obstetrics & Gynecology', 30, ['Pregnancy - third trimester', 'High-risk pregnancy', 'Caesarean section', 'Pre-eclampsia']),
+    ('Psychiatry', 20, ['Depression and anxiety', 'Bipolar disorder', 'Acute psychosis', 'Substance withdrawal']),
+    ('Oncology', 25, ['Lung cancer - Stage 2', 'Breast cancer chemotherapy', 'Lymphoma', 'Colorectal cancer']),
+    ('Pulmonology', 20, ['COPD exacerbation', 'Pulmonary embolism', 'Asthma', 'Pleural effusion']),
+    ('Nephrology', 15, ['Acute kidney injury', 'Chronic kidney disease', 'Dialysis complication', 'Electrolyte imbalance']),
+    ('Gastroenterology', 20, ['GI bleeding', 'Pancreatitis', 'Crohn\'s disease flare', 'Liver cirrhosis']),
+    ('Rheumatology', 10, ['Rheumatoid arthritis', 'Lupus flare', 'Gout', 'Vasculitis']),
+    ('Urology', 15, ['Kidney stones', 'Prostate surgery', 'Urinary retention', 'Bladder infection']),
+    ('Dermatology', 8, ['Cellulitis', 'Severe eczema', 'Burns', 'Psoriasis flare']),
+]
+
+# name: (share of admissions, mean stay in days, base fee, fee per day, hours between vitals)
+ADMISSION_TYPES = {
+    'Emergency': (0.30, 3.0, 1500, 450, 4),
+    'Planned Surgery': (0.20, 5.0, 3500, 600, 6),
+    'Regular Checkup': (0.20, 0.5, 300, 150, 2),
+    'Intensive Care': (0.07, 8.0, 5000, 1800, 1),
+    'Maternity': (0.08, 2.5, 2500, 500, 6),
+    'Observation': (0.15, 1.0, 600, 250, 4),
+}
+
+FIRST_NAMES = ['James', 'Maria', 'Sarah', 'Michael', 'Emily', 'Robert', 'Lisa', 'David', 'Sofia', 'William',
+               'Emma', 'Thomas', 'Linda', 'Richard', 'Patricia', 'Daniel', 'Olivia', 'Ahmed', 'Priya', 'Chen',
+               'Fatima', 'Lucas', 'Hannah', 'Mateo', 'Aisha', 'Noah', 'Yuki', 'Grace', 'Omar', 'Elena']
+LAST_NAMES = ['Wilson', 'Garcia', 'Johnson', 'Chang', 'Brown', 'Taylor', 'Anderson', 'Miller', 'Martinez',
+              'Turner', 'Davis', 'Wright', 'Kim', 'Lee', 'Moore', 'Patel', 'Nguyen', 'Smith', 'Jones', 'Khan',
+              'Rossi', 'Muller', 'Silva', 'Okafor', 'Sato', 'Novak', 'Cohen', 'Haddad', 'Larsen', 'Ivanova']
+SYMPTOMS = ['Fever', 'Shortness of breath', 'Chest pain', 'Nausea', 'Dizziness', 'Fatigue', 'Severe pain',
+            'Headache', 'Swelling', 'Loss of appetite']
+TREATMENTS = ['IV fluids and monitoring', 'Surgical intervention', 'Antibiotic course', 'Physiotherapy',
+              'Pain management', 'Oxygen therapy', 'Observation', 'Medication adjustment']
+MEDICATIONS = ['Paracetamol 1g QID', 'Amoxicillin 500mg TID', 'Metoprolol 50mg BD', 'Insulin glargine 20u',
+               'Morphine 5mg PRN', 'Enoxaparin 40mg OD', 'Omeprazole 20mg OD', 'Salbutamol inhaler PRN']
+VITALS_NOTES = ['Stable', 'Resting comfortably', 'Complains of pain', 'Improving', 'Monitor closely']
+
+BATCH_SIZE = 2000
+
+ADMISSION_COLUMNS = ['admissionid', 'admissiontype', 'department', 'patient', 'administrator',
+                     'condition', 'admissiondate', 'dischargedate', 'fee']
+VITALS_COLUMNS = ['admissionid', 'timestamp', 'temperature', 'blood_pressure', 'pulse_rate', 'notes',
+                  'recorded_by']
+MEDICAL_COLUMNS = ['admission_id', 'diagnosis', 'symptoms', 'treatment', 'medications', 'notes',
+                   'next_checkup', 'created_at', 'updated_at']
+
+RESET_TABLES = ['admissiondetails', 'medical_details', 'admission', 'patient', 'department_capacity',
+                'department', 'doctordetails', 'admissiontype', 'daily_admission_rollup',
+                'patient_search_word']
+
+
+def reserve_ids(cursor, table, column, count):
+    """Take ``count`` values from the column's sequence so rows can be COPYed with their IDs"""
+    cursor.execute(f"SELECT nextval(pg_get_serial_sequence('{table}', '{column}')) "
+                   f"FROM generate_series(1, %s)", (count,))
+    return [row[0] for row in cursor]
+
+
+def stay_days(rng, mean):
+    sigma = 0.6
+    return rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+
+class HospitalGenerator:
+    def __init__(self, seed, departments, doctors, patients, years, admissions_per_day, end,
+                 vitals=True, medical_details_share=0.7):
+        self.rng = random.Random(seed)
+        self.department_count = departments
+        self.doctor_count = doctors
+        self.patient_count = patients
+        self.years = years
+        self.admissions_per_day = admissions_per_day
+        self.end = end
+        self.vitals = vitals
+        self.medical_details_share = medical_details_share
+        self.counts = {'departments': 0, 'doctors': 0, 'patients': 0, 'admissions': 0, 'active': 0,
+                       'vitals': 0, 'medical_details': 0}
+
+    def ensure_departments(self, cursor):
+        cursor.execute("SELECT deptname, deptid FROM department")
+        existing = dict(cursor.fetchall())
+        self.departments = []
+        for i in range(self.department_count):
+            name, beds, conditions = DEPARTMENTS[i % len(DEPARTMENTS)]
+            if i >= len(DEPARTMENTS):
+                name = f'{name} {i // len(DEPARTMENTS) + 1}'
+            if name not in existing:
+                cursor.execute("INSERT INTO department (deptname) VALUES (%s) RETURNING deptid", (name,))
+                existing[name] = cursor.fetchone()[0]
+                cursor.execute("INSERT INTO department_capacity (deptid, beds) VALUES (%s, %s) "
+                               "ON CONFLICT (deptid) DO NOTHING", (existing[name], beds))
+                self.counts['departments'] += 1
+            # Larger departments see proportionally more admissions
+            self.departments.append({'id': existing[name], 'name': name, 'weight': beds,
+                                     'conditions': conditions, 'doctors': []})
+
+    def ensure_admission_types(self, cursor):
+        cursor.execute("SELECT admissiontypename, admissiontypeid FROM admissiontype")
+        existing = dict(cursor.fetchall())
+        self.admission_types = []
+        for name, (share, mean_stay, base_fee, daily_fee, vitals_hours) in ADMISSION_TYPES.items():
+            if name not in existing:
+                cursor.execute("INSERT INTO admissiontype (admissiontypename) VALUES (%s) "
+                               "RETURNING admissiontypeid", (name,))
+                existing[name] = cursor.fetchone()[0]
+            self.admission_types.append({'id': existing[name], 'name': name, 'share': share,
+                                         'mean_stay': mean_stay, 'base_fee': base_fee,
+                                         'daily_fee': daily_fee, 'vitals_hours': vitals_hours})
+
+    def ensure_admin(self, cursor):
+        cursor.execute("INSERT INTO admini (loginid, passid) VALUES ('admin', 'admin123') "
+                       "ON CONFLICT (loginid) DO NOTHING")
+
+    def create_doctors(self, cursor):
+        cursor.execute("SELECT loginid FROM admini")
+        taken = {row[0] for row in cursor}
+        logins, doctors = [], []
+        for i in range(self.doctor_count):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = f'dr.{last.lower()}{i + 1}'
+            while username in taken:
+                username += 'x'
+            taken.add(username)
+            department = self.departments[i % len(self.departments)]
+            department['doctors'].append(username)
+            logins.append((username, 'doctor123'))
+            doctors.append((username, f'Dr. {first} {last}', f'{username}@hospital.com'))
+        copy_rows(cursor, logins, 'admini', ['loginid', 'passid'])
+        copy_rows(cursor, doctors, 'doctordetails', ['username', 'doctorname', 'email'])
+        self.counts['doctors'] = len(doctors)
+
+    def create_patients(self, cursor):
+        ids = reserve_ids(cursor, 'patient', 'patientid', self.patient_count)
+        rows = []
+        for patient_id in ids:
+            department = self.rng.choice(self.departments)
+            rows.append((patient_id, f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                         self.rng.choice(department['conditions'])))
+            if len(rows) >= BATCH_SIZE * 5:
+                self.flush_patients(cursor, rows)
+                rows = []
+        self.flush_patients(cursor, rows)
+        self.patients = ids
+        # Each patient's own baseline vitals
+        self.baselines = {patient_id: (self.rng.gauss(36.9, 0.2), self.rng.gauss(122, 12),
+                                       self.rng.gauss(79, 8), self.rng.gauss(76, 9))
+                          for patient_id in ids}
+        self.counts['patients'] = len(ids)
+
+    def flush_patients(self, cursor, rows):
+        if not rows:
+            return
+        copy_rows(cursor, rows, 'patient', ['patientid', 'patientname', 'condition'])
+        cursor.execute(words_sql('(SELECT search_document FROM patient WHERE patientid = ANY(%(ids)s))'),
+                       {'ids': [row[0] for row in rows]})
+
+    def arrivals(self, day):
+        """Number of admissions on ``day``: winter peak, quieter weekends"""
+        seasonal = 1 + 0.15 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 15) / 365)
+        weekly = 0.8 if day.weekday() >= 5 else 1.08
+        mean = self.admissions_per_day * seasonal * weekly
+        return max(0, round(self.rng.gauss(mean, math.sqrt(mean))))
+
+    def admissions(self):
+        """Yield admissions in date order without overlapping stays for a patient"""
+        busy_until = {}
+        type_weights = [t['share'] for t in self.admission_types]
+        department_weights = [d['weight'] for d in self.departments]
+        maternity = next((t for t in self.admission_types if t['name'] == 'Maternity'), None)
+        day = self.end - timedelta(days=round(365.25 * self.years))
+        while day < self.end:
+            for _ in range(self.arrivals(day)):
+                admitted = day + timedelta(seconds=self.rng.randrange(86400))
+                if admitted >= self.end:
+                    continue
+                patient = None
+                for _ in range(5):
+                    candidate = self.rng.choice(self.patients)
+                    if busy_until.get(candidate, admitted) <= admitted:
+                        patient = candidate
+                        break
+                if patient is None:
+                    continue
+                department = self.rng.choices(self.departments, department_weights)[0]
+                if maternity and department['name'].startswith('Obstetrics') and self.rng.random() < 0.7:
+                    admission_type = maternity
+                else:
+                    admission_type = self.rng.choices(self.admission_types, type_weights)[0]
+                days = stay_days(self.rng, admission_type['mean_stay'])
+                discharged = admitted + timedelta(days=days)
+                fee = round(admission_type['base_fee'] + admission_type['daily_fee'] * days
+                            * self.rng.uniform(0.85, 1.15), 2)
+                doctors = department['doctors'] or self.departments[0]['doctors']
+                if discharged >= self.end:
+                    discharged = None
+                    busy_until[patient] = datetime.max
+                else:
+                    busy_until[patient] = discharged
+                yield {'type': admission_type, 'department': department, 'patient': patient,
+                       'doctor': self.rng.choice(doctors), 'condition': self.rng.choice(department['conditions']),
+                       'admitted': admitted, 'discharged': discharged, 'fee': fee}
+            day += timedelta(days=1)
+
+    def vitals_rows(self, admission_id, admission):
+        temperature, systolic, diastolic, pulse = self.baselines[admission['patient']]
+        # ICU patients run hotter and faster
+        if admission['type']['name'] == 'Intensive Care':
+            temperature, pulse = temperature + 0.6, pulse + 15
+        step = timedelta(hours=admission['type']['vitals_hours'])
+        until = admission['discharged'] or self.end
+        at = admission['admitted'] + timedelta(minutes=self.rng.randrange(30))
+        while at < until:
+            yield (admission_id, at, f'{self.rng.gauss(temperature, 0.3):.1f}',
+                   f'{round(self.rng.gauss(systolic, 8))}/{round(self.rng.gauss(diastolic, 6))}',
+                   round(self.rng.gauss(pulse, 6)),
+                   self.rng.choice(VITALS_NOTES) if self.rng.random() < 0.1 else None,
+                   admission['doctor'])
+            at += step
+
+    def medical_row(self, admission_id, admission):
+        created = admission['admitted'] + timedelta(hours=self.rng.uniform(0.5, 6))
+        discharged = admission['discharged']
+        return (admission_id, admission['condition'],
+                ', '.join(self.rng.sample(SYMPTOMS, self.rng.randint(1, 3))),
+                self.rng.choice(TREATMENTS), '; '.join(self.rng.sample(MEDICATIONS, self.rng.randint(1, 3))),
+                None, discharged + timedelta(days=14) if discharged else None, created,
+                discharged or created)
+
+    def write_admissions(self, connection, cursor):
+        batch = []
+        for admission in self.admissions():
+            batch.append(admission)
+            if len(batch) >= BATCH_SIZE:
+                self.flush_admissions(cursor, batch)
+                connection.commit()
+                batch = []
+        self.flush_admissions(cursor, batch)
+
+    def flush_admissions(self, cursor, batch):
+        if not batch:
+            return
+        ids = reserve_ids(cursor, 'admission', 'admissionid', len(batch))
+        copy_rows(cursor, [
+            (admission_id, a['type']['id'], a['department']['id'], a['patient'], a['doctor'], a['condition'],
+             a['admitted'], a['discharged'], f"{a['fee']:.2f}")
+            for admission_id, a in zip(ids, batch)
+        ], 'admission', ADMISSION_COLUMNS)
+        cursor.execute(batch_sql('(SELECT * FROM admission WHERE admissionid = ANY(%(ids)s))'), {'ids': ids})
+        medical = [self.medical_row(admission_id, a) for admission_id, a in zip(ids, batch)
+                   if self.rng.random() < self.medical_details_share]
+        copy_rows(cursor, medical, 'medical_details', MEDICAL_COLUMNS)
+        self.counts['admissions'] += len(batch)
+        self.counts['active'] += sum(1 for a in batch if a['discharged'] is None)
+        self.counts['medical_details'] += len(medical)
+        if self.vitals:
+            vitals = []
+            for admission_id, a in zip(ids, batch):
+                vitals.extend(self.vitals_rows(admission_id, a))
+                if len(vitals) >= BATCH_SIZE * 25:
+                    copy_rows(cursor, vitals, 'admissiondetails', VITALS_COLUMNS)
+                    self.counts['vitals'] += len(vitals)
+                    vitals = []
+            copy_rows(cursor, vitals, 'admissiondetails', VITALS_COLUMNS)
+            self.counts['vitals'] += len(vitals)
+
+    def fit_capacity(self, cursor):
+        """Make sure every generated department has a bed for each active admission"""
+        cursor.execute(
+            "UPDATE department_capacity c SET beds = a.active "
+            "FROM (SELECT department, count(*) AS active FROM admission "
+            "      WHERE dischargedate IS NULL GROUP BY department) a "
+            "WHERE c.deptid = a.department AND c.beds < a.active"
+        )
+
+    def run(self, engine, reset=False, progress=None):
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if reset:
+                cursor.execute(f"TRUNCATE {', '.join(RESET_TABLES)} RESTART IDENTITY CASCADE")
+                cursor.execute("DELETE FROM admini WHERE loginid <> 'admin'")
+            self.ensure_admin(cursor)
+            self.ensure_departments(cursor)
+            self.ensure_admission_types(cursor)
+            self.create_doctors(cursor)
+            connection.commit()
+            if progress:
+                progress('reference data', self.counts)
+            self.create_patients(cursor)
+            connection.commit()
+            if progress:
+                progress('patients', self.counts)
+            self.write_admissions(connection, cursor)
+            self.fit_capacity(cursor)
+            connection.commit()
+            if progress:
+                progress('admissions', self.counts)
+            cursor.execute("ANALYZE")
+            connection.commit()
+            return self.counts
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic hospital')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--departments', type=int, default=12)
+    parser.add_argument('--doctors', type=int, default=60)
+    parser.add_argument('--patients', type=int, default=20000)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--admissions-per-day', type=float, default=60)
+    parser.add_argument('--end-date', help='YYYY-MM-DD (default: today); fix it for reproducible output')
+    parser.add_argument('--no-vitals', action='store_true', help='skip admissiondetails rows')
+    parser.add_argument('--reset', action='store_true',
+                        help='empty the patient, doctor, department and admission tables first')
+    args = parser.parse_args()
+
+    end = (datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date
+           else datetime.combine(datetime.utcnow().date(), datetime.min.time()))
+    generator = HospitalGenerator(args.seed, args.departments, args.doctors, args.patients, args.years,
+                                  args.admissions_per_day, end, vitals=not args.no_vitals)
+    started = time.perf_counter()
+
+    def report(stage, counts):
+        print(f"  {stage:<16} {time.perf_counter() - started:>8.1f}s  "
+              + '  '.join(f"{name}={count:,}" for name, count in counts.items()))
+
+    print(f"\nGenerating hospital data (seed {args.seed}, {args.years:g} years up to {end.date()})")
+    print("=" * 80)
+    generator.run(get_engine(), reset=args.reset, progress=report)
+    print("=" * 80)
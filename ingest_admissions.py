@@ -0,0 +1,322 @@
+"""Bulk-load historical admissions from a CSV or NDJSON file.
+
+    python ingest_admissions.py old_his_admissions.csv --rejects rejects.ndjson
+
+The input is read one record at a time and validated against the patient,
+department, admission type and doctor IDs loaded into memory up front, so
+no per-row lookups are made. Valid rows are written with PostgreSQL COPY in
+batches through a temporary staging table, from which the batch is moved
+into admission and counted into daily_admission_rollup; each batch commits
+together with a checkpoint row in ``ingest_checkpoint``, so re-running the same command after an interruption
+continues after the last committed batch. Invalid rows are appended to the
+rejects file as NDJSON (record number, error and the original fields); the
+``fields`` objects can be fixed and fed back in as an NDJSON input.
+
+Columns use the admission table names or the API field names:
+patient/patient_id, department/department_id,
+admissiontype/admission_type_id, administrator/doctor_username,
+condition, admissiondate/admission_date, dischargedate/discharge_date, fee.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from io import StringIO
+
+from database import get_engine
+from rollup import batch_sql
+
+COPY_COLUMNS = ['admissiontype', 'department', 'patient', 'administrator',
+                'condition', 'admissiondate', 'dischargedate', 'fee']
+
+# Per-connection staging table each batch is copied into first
+STAGING_TABLE = 'ingest_admission_batch'
+
+FIELD_ALIASES = {
+    'patient_id': 'patient',
+    'department_id': 'department',
+    'admission_type_id': 'admissiontype',
+    'doctor_username': 'administrator',
+    'admission_date': 'admissiondate',
+    'discharge_date': 'dischargedate',
+}
+
+REQUIRED_FIELDS = ['patient', 'department', 'admissiontype', 'administrator', 'admissiondate']
+
+# COPY text format: backslash escapes for the characters that delimit rows/columns
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+FINGERPRINT_BYTES = 65536
+
+
+def detect_format(path):
+    return 'ndjson' if os.path.splitext(path)[1].lower() in ('.ndjson', '.jsonl', '.json') else 'csv'
+
+
+def read_records(path, file_format):
+    """Yield ``(record_number, fields)`` without loading the file into memory"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, row
+        else:
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError(f'record {number} is a JSON {type(record).__name__}, not an object')
+                except ValueError as e:
+                    record = {'_error': f'Invalid JSON: {e}', '_line': line.rstrip('\n')}
+                yield number, record
+
+
+def file_fingerprint(path):
+    """Hash of the start of the file, used to refuse resuming on a different file"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(FINGERPRINT_BYTES)).hexdigest()
+
+
+class ReferenceSets:
+    """IDs a new admission may refer to, loaded once before the ingest"""
+
+    def __init__(self, patients, departments, admission_types, doctors, active_patients):
+        self.patients = patients
+        self.departments = departments
+        self.admission_types = admission_types
+        self.doctors = doctors
+        # Patients with an active admission; a patient may have only one
+        self.active_patients = active_patients
+
+    @classmethod
+    def load(cls, cursor):
+        def column(sql):
+            cursor.execute(sql)
+            return {row[0] for row in cursor}
+        return cls(
+            patients=column("SELECT patientid FROM patient"),
+            departments=column("SELECT deptid FROM department"),
+            admission_types=column("SELECT admissiontypeid FROM admissiontype"),
+            doctors=column("SELECT username FROM doctordetails"),
+            active_patients=column("SELECT DISTINCT patient FROM admission WHERE dischargedate IS NULL")
+        )
+
+
+def normalize(record):
+    fields = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = FIELD_ALIASES.get(key.strip().lower(), key.strip().lower())
+        if isinstance(value, str):
+            value = value.strip()
+        fields[key] = None if value == '' else value
+    return fields
+
+
+def parse_int(fields, name):
+    try:
+        return int(fields[name])
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'{name} must be an integer, got {fields[name]!r}')
+
+
+def parse_timestamp(fields, name):
+    value = fields.get(name)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date/time, got {value!r}')
+
+
+def validate(record, refs):
+    """Return the COPY row for ``record`` or raise ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError('Record must be a JSON object')
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    fields = normalize(record)
+    missing = [name for name in REQUIRED_FIELDS if fields.get(name) is None]
+    if missing:
+        raise ValueError(f'Missing required fields: {", ".join(missing)}')
+
+    patient = parse_int(fields, 'patient')
+    if patient not in refs.patients:
+        raise ValueError(f'Patient with ID {patient} not found')
+    department = parse_int(fields, 'department')
+    if department not in refs.departments:
+        raise ValueError(f'Department with ID {department} not found')
+    admission_type = parse_int(fields, 'admissiontype')
+    if admission_type not in refs.admission_types:
+        raise ValueError(f'Admission type with ID {admission_type} not found')
+    doctor = str(fields['administrator'])
+    if doctor not in refs.doctors:
+        raise ValueError(f'Doctor with username {doctor} not found')
+
+    admission_date = parse_timestamp(fields, 'admissiondate')
+    discharge_date = parse_timestamp(fields, 'dischargedate')
+    if discharge_date is not None:
+        if (discharge_date.tzinfo is None) != (admission_date.tzinfo is None):
+            raise ValueError('admissiondate and dischargedate must both include or both omit a UTC offset')
+        if discharge_date < admission_date:
+            raise ValueError('dischargedate is before admissiondate')
+    elif patient in refs.active_patients:
+        raise ValueError(f'Patient {patient} already has an active admission')
+
+    try:
+        fee = Decimal(str(fields['fee'])) if fields.get('fee') is not None else Decimal(0)
+    except InvalidOperation:
+        raise ValueError(f'fee must be a number, got {fields["fee"]!r}')
+    if not fee.is_finite() or fee < 0 or fee >= Decimal('1e8'):
+        raise ValueError(f'fee out of range: {fields["fee"]!r}')
+
+    if discharge_date is None:
+        refs.active_patients.add(patient)
+    condition = fields.get('condition')
+    return (admission_type, department, patient, doctor,
+            '' if condition is None else str(condition),
+            admission_date.isoformat(sep=' '),
+            discharge_date.isoformat(sep=' ') if discharge_date else None,
+            f'{fee:.2f}')
+
+
+def copy_rows(cursor, rows, table='admission', columns=COPY_COLUMNS):
+    """Write ``rows`` into ``table`` with a single COPY"""
+    buffer = StringIO()
+    for row in rows:
+        buffer.write('\t'.join('\\N' if value is None else str(value).translate(COPY_ESCAPES)
+                               for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def load_checkpoint(cursor, source):
+    cursor.execute("SELECT fingerprint, position, rows_loaded, rows_rejected "
+                   "FROM ingest_checkpoint WHERE source = %s", (source,))
+    return cursor.fetchone()
+
+
+def save_checkpoint(cursor, source, fingerprint, position, loaded, rejected):
+    cursor.execute(
+        "INSERT INTO ingest_checkpoint (source, fingerprint, position, rows_loaded, rows_rejected, updated_at) "
+        "VALUES (%s, %s, %s, %s, %s, now()) "
+        "ON CONFLICT (source) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, "
+        "position = EXCLUDED.position, rows_loaded = EXCLUDED.rows_loaded, "
+        "rows_rejected = EXCLUDED.rows_rejected, updated_at = now()",
+        (source, fingerprint, position, loaded, rejected))
+
+
+def ingest(path, file_format=None, batch_size=5000, rejects_path=None, source=None,
+           restart=False, engine=None, progress=None):
+    """Load ``path`` into the admission table; returns the run's counters.
+
+    ``source`` names the checkpoint (default: the file's absolute path).
+    ``progress`` is called with the counters after every committed batch.
+    """
+    file_format = file_format or detect_format(path)
+    source = source or os.path.abspath(path)
+    fingerprint = file_fingerprint(path)
+    rejects_path = rejects_path or f'{path}.rejects.ndjson'
+    engine = engine or get_engine()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        checkpoint = None if restart else load_checkpoint(cursor, source)
+        if checkpoint and checkpoint[0] != fingerprint:
+            raise SystemExit(f'{path} has changed since checkpoint "{source}" was written; '
+                             f'use --restart to load it from the beginning')
+        position, loaded, rejected = checkpoint[1:] if checkpoint else (0, 0, 0)
+        refs = ReferenceSets.load(cursor)
+        cursor.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE admission INCLUDING DEFAULTS) "
+                       f"ON COMMIT DELETE ROWS")
+        connection.commit()
+
+        stats = {'source': source, 'resumed_from': position, 'loaded': loaded, 'rejected': rejected,
+                 'position': position, 'seconds': 0.0}
+        started = time.perf_counter()
+        with open(rejects_path, 'a' if position else 'w', encoding='utf-8') as rejects:
+            batch, batch_rejects = [], []
+
+            def flush(upto):
+                # Rejects are written before the commit: an interruption can
+                # repeat a batch's rejects but never lose them
+                for number, error, record in batch_rejects:
+                    rejects.write(json.dumps({'record': number, 'error': error, 'fields': record},
+                                             default=str) + '\n')
+                rejects.flush()
+                if batch:
+                    copy_rows(cursor, batch, table=STAGING_TABLE)
+                    columns = ', '.join(['admissionid'] + COPY_COLUMNS)
+                    cursor.execute(f"INSERT INTO admission ({columns}) SELECT {columns} FROM {STAGING_TABLE}")
+                    cursor.execute(batch_sql(STAGING_TABLE))
+                stats['loaded'] += len(batch)
+                stats['rejected'] += len(batch_rejects)
+                stats['position'] = upto
+                save_checkpoint(cursor, source, fingerprint, upto, stats['loaded'], stats['rejected'])
+                connection.commit()
+                stats['seconds'] = time.perf_counter() - started
+                batch.clear()
+                batch_rejects.clear()
+                if progress:
+                    progress(stats)
+
+            number = position
+            for number, record in read_records(path, file_format):
+                if number <= position:
+                    continue
+                try:
+                    batch.append(validate(record, refs))
+                except ValueError as e:
+                    # Unparseable NDJSON lines are kept as the raw text
+                    batch_rejects.append((number, str(e), record.get('_line', record)))
+                if len(batch) + len(batch_rejects) >= batch_size:
+                    flush(number)
+            if batch or batch_rejects or not checkpoint:
+                flush(number)
+        stats['seconds'] = time.perf_counter() - started
+        return stats
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def print_progress(stats):
+    rate = (stats['position'] - stats['resumed_from']) / stats['seconds'] if stats['seconds'] else 0
+    print(f"  record {stats['position']:>10,}  loaded {stats['loaded']:>10,}  "
+          f"rejected {stats['rejected']:>8,}  {rate:>10,.0f} records/sec")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bulk-load admissions from CSV or NDJSON')
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='default: from the file extension')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--rejects', help='default: <path>.rejects.ndjson')
+    parser.add_argument('--checkpoint', help='checkpoint name (default: absolute path of the file)')
+    parser.add_argument('--restart', action='store_true', help='ignore any checkpoint and start from the top '
+                        '(rows loaded by earlier runs are not removed)')
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args()
+
+    print(f"\nIngesting admissions from {args.path}")
+    print("=" * 80)
+    result = ingest(args.path, args.format, args.batch_size, args.rejects, args.checkpoint,
+                    args.restart, progress=None if args.quiet else print_progress)
+    if result['resumed_from']:
+        print(f"Resumed after record {result['resumed_from']:,}")
+    print(f"Loaded: {result['loaded']:,}   Rejected: {result['rejected']:,}   "
+          f"Records read: {result['position']:,}   Time: {result['seconds']:.1f}s")
+    print("=" * 80)
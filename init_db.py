@@ -3,9 +3,14 @@ from psycopg2 import sql
 from dotenv import load_dotenv
 import os
 import logging
-from app import db, Patient, Department, AdmissionType, Admin, Doctor, Admission, app
-from datetime import datetime, timedelta
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from database import get_engine, session_scope
+from models import Patient, Department, AdmissionType, Admin, Doctor
+from rollup import backfill
+from search import rebuild_words
 from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -14,17 +19,23 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+def alembic_config():
+    """Alembic configuration for the migrations next to this script; the
+    database comes from DATABASE_URL, as for the app (see migrations/env.py)"""
+    config = AlembicConfig()
+    config.set_main_option('script_location',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+    return config
+
 def init_database():
     """Initialize the database and create required tables"""
     DATABASE_URL = os.getenv('DATABASE_URL')
     
     # Extract connection parameters from DATABASE_URL
-    db_params = DATABASE_URL.replace('postgresql://', '')
-    user_pass, host_db = db_params.split('@')
-    user, password = user_pass.split(':')
-    host_port, db_name = host_db.split('/')
-    host = host_port.split(':')[0]
-    port = host_port.split(':')[1] if ':' in host_port else '5432'
+    url = make_url(DATABASE_URL)
+    user, password = url.username, url.password
+    host, port = url.host, url.port or 5432
+    db_name = url.database
 
     try:
         # First, connect to PostgreSQL server without specifying a database
@@ -61,56 +72,26 @@ def init_database():
         )
         cursor = conn.cursor()
         
-        # Create tables if they don't exist
-        create_tables_sql = """
-        -- Drop existing tables if they exist
+        # Start from an empty schema: undo the migrations, then drop the tables
+        # of databases created before there were any
+        command.downgrade(alembic_config(), 'base')
+        cursor.execute("""
+        DROP TABLE IF EXISTS Medical_Details CASCADE;
+        DROP TABLE IF EXISTS AdmissionDetails CASCADE;
+        DROP TABLE IF EXISTS Department_Capacity CASCADE;
         DROP TABLE IF EXISTS Admission CASCADE;
         DROP TABLE IF EXISTS Patient CASCADE;
         DROP TABLE IF EXISTS AdmissionType CASCADE;
         DROP TABLE IF EXISTS Department CASCADE;
         DROP TABLE IF EXISTS Doctordetails CASCADE;
         DROP TABLE IF EXISTS Admini CASCADE;
+        """)
+        conn.commit()
 
-        -- Create tables
-        CREATE TABLE Admini (
-            Loginid VARCHAR(50) PRIMARY KEY,
-            passid VARCHAR(50) NOT NULL
-        );
-
-        CREATE TABLE Doctordetails (
-            UserName VARCHAR(50) PRIMARY KEY REFERENCES Admini(Loginid),
-            DoctorName VARCHAR(100) NOT NULL,
-            Email VARCHAR(100)
-        );
-
-        CREATE TABLE Department (
-            DeptId SERIAL PRIMARY KEY,
-            DeptName VARCHAR(100) UNIQUE NOT NULL
-        );
-
-        CREATE TABLE AdmissionType (
-            AdmissionTypeID SERIAL PRIMARY KEY,
-            AdmissionTypeName VARCHAR(50) UNIQUE NOT NULL
-        );
-
-        CREATE TABLE Patient (
-            PatientId SERIAL PRIMARY KEY,
-            PatientName VARCHAR(100) NOT NULL,
-            Condition TEXT
-        );
-
-        CREATE TABLE Admission (
-            AdmissionID SERIAL PRIMARY KEY,
-            AdmissionType INTEGER REFERENCES AdmissionType(AdmissionTypeID),
-            Department INTEGER REFERENCES Department(DeptId),
-            Patient INTEGER REFERENCES Patient(PatientId),
-            Administrator VARCHAR(50) REFERENCES Doctordetails(UserName),
-            Condition TEXT,
-            AdmissionDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            DischargeDate TIMESTAMP,
-            Fee DECIMAL(10,2)
-        );
+        # Create the tables
+        command.upgrade(alembic_config(), 'head')
 
+        sample_data_sql = """
         -- Insert admin users
         INSERT INTO Admini (Loginid, passid) VALUES
             ('admin', 'admin123'),
@@ -191,7 +172,7 @@ def init_database():
         ON CONFLICT (AdmissionID) DO NOTHING;
         """
         
-        cursor.execute(create_tables_sql)
+        cursor.execute(sample_data_sql)
         conn.commit()
         logger.info("Tables created and sample data inserted successfully")
 
@@ -204,197 +185,25 @@ def init_database():
         if conn:
             conn.close()
 
-    # Create tables
-    db.create_all()
-
-    # Add sample departments
-    departments = [
-        Department(dept_id=1, dept_name='Cardiology'),
-        Department(dept_id=2, dept_name='Orthopedics'),
-        Department(dept_id=3, dept_name='Pediatrics'),
-        Department(dept_id=4, dept_name='Neurology'),
-        Department(dept_id=5, dept_name='Emergency'),
-        Department(dept_id=6, dept_name='Internal Medicine')
-    ]
-
-    # Add sample admission types
-    admission_types = [
-        AdmissionType(admission_type_id=1, admission_type_name='Emergency'),
-        AdmissionType(admission_type_id=2, admission_type_name='Planned Surgery'),
-        AdmissionType(admission_type_id=3, admission_type_name='Regular Checkup'),
-        AdmissionType(admission_type_id=4, admission_type_name='Intensive Care')
-    ]
-
-    # Add admin and doctors
-    admin = Admin(loginid='admin', passid='admin123')
-    doctors = [
-        Doctor(username='dr.smith', doctor_name='Dr. John Smith', email='smith@hospital.com'),
-        Doctor(username='dr.jones', doctor_name='Dr. Sarah Jones', email='jones@hospital.com'),
-        Doctor(username='dr.patel', doctor_name='Dr. Raj Patel', email='patel@hospital.com'),
-        Doctor(username='dr.chen', doctor_name='Dr. Li Chen', email='chen@hospital.com')
-    ]
-
-    # Add sample patients
-    patients = [
-        Patient(
-            patient_id=1,
-            patient_name='James Wilson',
-            condition='Hypertension and mild chest pain'
-        ),
-        Patient(
-            patient_id=2,
-            patient_name='Maria Garcia',
-            condition='Fractured right femur'
-        ),
-        Patient(
-            patient_id=3,
-            patient_name='Sarah Johnson',
-            condition='Type 2 Diabetes'
-        ),
-        Patient(
-            patient_id=4,
-            patient_name='Michael Chang',
-            condition='Post-surgery recovery'
-        ),
-        Patient(
-            patient_id=5,
-            patient_name='Emily Brown',
-            condition='Acute appendicitis'
-        ),
-        Patient(
-            patient_id=6,
-            patient_name='Robert Taylor',
-            condition='Chronic back pain'
-        ),
-        Patient(
-            patient_id=7,
-            patient_name='Lisa Anderson',
-            condition='Migraine and vertigo'
-        ),
-        Patient(
-            patient_id=8,
-            patient_name='David Miller',
-            condition='Pneumonia'
-        ),
-        Patient(
-            patient_id=9,
-            patient_name='Sofia Martinez',
-            condition='Pregnancy - third trimester'
-        ),
-        Patient(
-            patient_id=10,
-            patient_name='William Turner',
-            condition='Cardiac arrhythmia'
-        )
-    ]
-
-    # Add sample admissions
-    current_time = datetime.utcnow()
-    admissions = [
-        # Active admissions
-        Admission(
-            patient=1,
-            department=1,  # Cardiology
-            admission_type=1,  # Emergency
-            administrator='dr.smith',
-            condition='Admitted for chest pain evaluation',
-            admission_date=current_time - timedelta(days=2),
-            fee=1500.00
-        ),
-        Admission(
-            patient=2,
-            department=2,  # Orthopedics
-            admission_type=2,  # Planned Surgery
-            administrator='dr.jones',
-            condition='Scheduled for femur surgery',
-            admission_date=current_time - timedelta(days=1),
-            fee=3500.00
-        ),
-        Admission(
-            patient=5,
-            department=5,  # Emergency
-            admission_type=1,  # Emergency
-            administrator='dr.patel',
-            condition='Emergency appendectomy required',
-            admission_date=current_time - timedelta(hours=12),
-            fee=2500.00
-        ),
-        
-        # Past/discharged admissions
-        Admission(
-            patient=3,
-            department=6,  # Internal Medicine
-            admission_type=3,  # Regular Checkup
-            administrator='dr.chen',
-            condition='Diabetes monitoring and medication adjustment',
-            admission_date=current_time - timedelta(days=30),
-            discharge_date=current_time - timedelta(days=28),
-            fee=800.00
-        ),
-        Admission(
-            patient=4,
-            department=2,  # Orthopedics
-            admission_type=2,  # Planned Surgery
-            administrator='dr.jones',
-            condition='Knee replacement surgery',
-            admission_date=current_time - timedelta(days=15),
-            discharge_date=current_time - timedelta(days=10),
-            fee=4500.00
-        ),
-        Admission(
-            patient=7,
-            department=4,  # Neurology
-            admission_type=3,  # Regular Checkup
-            administrator='dr.smith',
-            condition='Severe migraine evaluation',
-            admission_date=current_time - timedelta(days=45),
-            discharge_date=current_time - timedelta(days=44),
-            fee=1200.00
-        )
-    ]
-
-    # Add all records to database
-    try:
-        # Add departments
-        for dept in departments:
-            db.session.add(dept)
-        
-        # Add admission types
-        for admission_type in admission_types:
-            db.session.add(admission_type)
-        
-        # Add admin and doctors
-        db.session.add(admin)
-        for doctor in doctors:
-            db.session.add(doctor)
-        
-        # Add patients
-        for patient in patients:
-            db.session.add(patient)
-        
-        # Add admissions
-        for admission in admissions:
-            db.session.add(admission)
-        
-        # Commit all changes
-        db.session.commit()
-        print("Sample data added successfully!")
-
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error adding sample data: {str(e)}")
+    # The sample rows bypassed the app, so build what it maintains on writes
+    with session_scope() as session:
+        backfill(session)
+        rebuild_words(session)
+        session.commit()
+    logger.info("Admission rollup and patient search words rebuilt")
 
 def init_db():
-    with app.app_context():
-        # Create all tables
-        db.create_all()
-        
+    # Create or upgrade the tables
+    command.upgrade(alembic_config(), 'head')
+    engine = get_engine()
+
+    with session_scope() as session:
         # Check if tables exist
-        inspector = inspect(db.engine)
+        inspector = inspect(engine)
         print("Tables in database:", inspector.get_table_names())
         
         # Add sample data only if tables are empty
-        if not Admin.query.first():
+        if not session.query(Admin).first():
             # Insert Admin Users
             admins = [
                 Admin(loginid='admin', passid='admin123'),
@@ -403,11 +212,11 @@ def init_db():
                 Admin(loginid='dr.patel', passid='doctor789'),
                 Admin(loginid='dr.chen', passid='doctor101')
             ]
-            db.session.add_all(admins)
-            db.session.commit()
+            session.add_all(admins)
+            session.commit()
             print("Added admin users")
 
-        if not Doctor.query.first():
+        if not session.query(Doctor).first():
             # Insert Doctors
             doctors = [
                 Doctor(username='dr.smith', doctorname='Dr. John Smith', email='smith@hospital.com'),
@@ -415,11 +224,11 @@ def init_db():
                 Doctor(username='dr.patel', doctorname='Dr. Raj Patel', email='patel@hospital.com'),
                 Doctor(username='dr.chen', doctorname='Dr. Li Chen', email='chen@hospital.com')
             ]
-            db.session.add_all(doctors)
-            db.session.commit()
+            session.add_all(doctors)
+            session.commit()
             print("Added doctors")
 
-        if not Department.query.first():
+        if not session.query(Department).first():
             # Insert Departments
             departments = [
                 Department(deptname='Cardiology'),
@@ -433,11 +242,11 @@ def init_db():
                 Department(deptname='Psychiatry'),
                 Department(deptname='Oncology')
             ]
-            db.session.add_all(departments)
-            db.session.commit()
+            session.add_all(departments)
+            session.commit()
             print("Added departments")
 
-        if not AdmissionType.query.first():
+        if not session.query(AdmissionType).first():
             # Insert Admission Types
             admission_types = [
                 AdmissionType(admissiontypename='Emergency'),
@@ -447,11 +256,11 @@ def init_db():
                 AdmissionType(admissiontypename='Maternity'),
                 AdmissionType(admissiontypename='Observation')
             ]
-            db.session.add_all(admission_types)
-            db.session.commit()
+            session.add_all(admission_types)
+            session.commit()
             print("Added admission types")
 
-        if not Patient.query.first():
+        if not session.query(Patient).first():
             # Insert Patients
             patients = [
                 Patient(patientname='James Wilson', condition='Hypertension and mild chest pain'),
@@ -470,17 +279,19 @@ def init_db():
                 Patient(patientname='Richard Lee', condition='Stroke recovery'),
                 Patient(patientname='Patricia Moore', condition='High-risk pregnancy')
             ]
-            db.session.add_all(patients)
-            db.session.commit()
+            session.add_all(patients)
+            session.flush()
+            rebuild_words(session)
+            session.commit()
             print("Added patients")
 
         # Print counts
         print(f"\nCurrent database status:")
-        print(f"Admins: {Admin.query.count()}")
-        print(f"Doctors: {Doctor.query.count()}")
-        print(f"Departments: {Department.query.count()}")
-        print(f"Admission Types: {AdmissionType.query.count()}")
-        print(f"Patients: {Patient.query.count()}")
+        print(f"Admins: {session.query(Admin).count()}")
+        print(f"Doctors: {session.query(Doctor).count()}")
+        print(f"Departments: {session.query(Department).count()}")
+        print(f"Admission Types: {session.query(AdmissionType).count()}")
+        print(f"Patients: {session.query(Patient).count()}")
 
 if __name__ == "__main__":
     init_db() 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import cProfile
+import heapq
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestStats:
+    """SQL activity of one request: statement count, time spent in the
+    database and the ``max_statements`` slowest statements (text only, no
+    parameters, so patient data never reaches the logs)."""
+
+    def __init__(self, max_statements=20):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.count = 0
+        self.db_seconds = 0.0
+        self.max_statements = max_statements
+        self._slowest = []
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.db_seconds += seconds
+        entry = (seconds, self.count, statement)
+        if len(self._slowest) < self.max_statements:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+        return self
+
+    @property
+    def elapsed_ms(self):
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+    @property
+    def db_ms(self):
+        return self.db_seconds * 1000
+
+    def slowest(self):
+        """``(milliseconds, statement)`` pairs, slowest first"""
+        return [(seconds * 1000, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+    def server_timing(self):
+        """Value for the ``Server-Timing`` response header"""
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.count} queries"']
+        if self._slowest:
+            parts.append(f'db-slowest;dur={max(self._slowest)[0] * 1000:.1f}')
+        parts.append(f'app;dur={self.elapsed_ms:.1f}')
+        return ', '.join(parts)
+
+    def describe(self, limit=None):
+        lines = [f"{self.count} queries, {self.db_ms:.1f} ms in the database, {self.elapsed_ms:.1f} ms total"]
+        for ms, statement in self.slowest()[:limit]:
+            lines.append(f"  {ms:8.1f} ms  {' '.join(statement.split())}")
+        return '\n'.join(lines)
+
+
+class SQLInstrumentation:
+    """Attributes every statement run through SQLAlchemy to the request
+    being served on the same thread.
+
+    ``start``/``stop`` bracket a request; they nest, so a request served
+    from inside another one (the profiler) is counted on its own. Statements
+    run outside a request, or after the response has been handed over (in a
+    streaming generator), are not recorded.
+    """
+
+    def __init__(self, max_statements=20):
+        self.max_statements = max_statements
+        self._local = threading.local()
+
+    def attach(self, target=Engine):
+        """Listen on ``target``: an engine, or by default every engine"""
+        event.listen(target, 'before_cursor_execute', self._before_execute)
+        event.listen(target, 'after_cursor_execute', self._after_execute)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and self._stack():
+            context._instrumentation_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_instrumentation_started', None)
+        stack = self._stack()
+        if started is not None and stack:
+            stack[-1].record(statement, time.perf_counter() - started)
+
+    def start(self):
+        stats = RequestStats(self.max_statements)
+        self._stack().append(stats)
+        return stats
+
+    def stop(self):
+        stack = self._stack()
+        if not stack:
+            return None
+        self._local.last = stack.pop().finish()
+        return self._local.last
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def last(self):
+        """Stats of the request most recently stopped on this thread"""
+        return getattr(self._local, 'last', None)
+
+
+class StackProfiler:
+    """Records time per call stack for a flamegraph.
+
+    Every Python and C call on the profiled thread is traced, so this is
+    slow and meant for one request at a time. ``folded`` returns the
+    collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._stack = []
+        self._last = None
+
+    def _trace(self, frame, event_name, arg):
+        now = time.perf_counter()
+        if self._stack:
+            self.totals[';'.join(self._stack)] += now - self._last
+        if event_name == 'call':
+            code = frame.f_code
+            self._stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        elif event_name == 'c_call':
+            self._stack.append(f"{getattr(arg, '__qualname__', repr(arg))} (built-in)")
+        elif self._stack:
+            self._stack.pop()
+        self._last = time.perf_counter()
+
+    def runcall(self, func, *args, **kwargs):
+        self._last = time.perf_counter()
+        sys.setprofile(self._trace)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+
+    def folded(self):
+        return ''.join(f'{stack} {round(seconds * 1e6)}\n'
+                       for stack, seconds in sorted(self.totals.items()) if seconds >= 1e-6)
+
+
+def profile_call(func, mode='text', limit=40):
+    """Run ``func`` under a profiler; returns ``(result, report)``.
+
+    ``mode`` is ``text`` (pstats summary by cumulative time), ``prof``
+    (binary pstats data for snakeviz, flameprof and similar tools) or
+    ``collapsed`` (folded stacks for a flamegraph).
+    """
+    if mode == 'collapsed':
+        profiler = StackProfiler()
+        result = profiler.runcall(func)
+        return result, profiler.folded()
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func)
+    if mode == 'prof':
+        profiler.create_stats()
+        return result, marshal.dumps(profiler.stats)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return result, out.getvalue()
@@ -0,0 +1,120 @@
+"""Local background job helpers.
+
+``JobPool`` runs job functions in a process pool so long reports never hold
+a web worker, and ``ArtifactStore`` keeps their output on disk until it
+expires. Job state itself lives in the database (see ``ReportJob`` in models.py)
+so any web process can answer a status poll.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def job_cache_key(kind, params):
+    """Identify a job by what it computes, so identical requests share it"""
+    payload = json.dumps([kind, params], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class JobPool:
+    """Lazily started process pool.
+
+    The pool is only created on the first submit, so importing the app from
+    scripts or migrations never starts worker processes. Workers are spawned
+    rather than forked: the web process runs other threads (the connection
+    pool, the refreshers) whose locks a forked child could inherit held, so
+    each worker starts a fresh interpreter and sets itself up through
+    ``initializer``.
+    """
+
+    def __init__(self, max_workers=2, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=self.initializer, initargs=self.initargs)
+            future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _log_failure(self, future):
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Background job crashed: {error!r}")
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class ArtifactStore:
+    """Finished job output stored as ``<key>.<ext>`` files with a TTL"""
+
+    def __init__(self, directory, ttl=3600, evict_interval=60):
+        self.directory = directory
+        self.ttl = ttl
+        self.evict_interval = evict_interval
+        self._last_eviction = 0.0
+
+    def path(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def is_fresh(self, key, ext):
+        try:
+            return time.time() - os.path.getmtime(self.path(key, ext)) < self.ttl
+        except OSError:
+            return False
+
+    @contextmanager
+    def open_for_write(self, key, ext):
+        """Write to a temporary file and move it into place on success,
+        so readers never see a partially written artifact."""
+        os.makedirs(self.directory, exist_ok=True)
+        final_path = self.path(key, ext)
+        tmp_path = f"{final_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def evict_expired(self, force=False):
+        """Delete artifacts older than the TTL; at most once per interval"""
+        now = time.time()
+        if not force and now - self._last_eviction < self.evict_interval:
+            return 0
+        self._last_eviction = now
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime >= self.ttl:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                # Removed by another process in the meantime
+                continue
+        return removed
@@ -0,0 +1,351 @@
+"""Locust-style load test replaying a realistic mix of traffic against app.py.
+
+    python generate_data.py --seed 7          # a hospital worth testing against
+    python loadtest.py --users 20 --duration 60
+
+The app is served in-process on a local port; queries per request come
+from the app's Server-Timing header (see instrumentation.py). Each virtual user logs in with its
+own session and picks weighted tasks with a think time between them:
+dashboard polls, list and detail views, admit/discharge cycles, vitals and
+medical notes, record maintenance and reports. The result is a table of
+p50/p95/p99 latency and queries per request for every route in app.py,
+with the routes the mix did not reach listed at the end.
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from flask import request
+from sqlalchemy import text
+from werkzeug.serving import make_server
+
+from app import app, db
+
+# Requests the mix never sends: they end the session or never finish (and /debug/*)
+EXCLUDED_ROUTES = {'GET /logout', 'GET /api/stream/dashboard'}
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def tag_route(response):
+    """Name the route that served each response so results group by route"""
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    response.headers['X-Loadtest-Route'] = f'{request.method} {rule}'
+    return response
+
+
+def query_count(response):
+    """Statements the request ran, from the app's Server-Timing header"""
+    match = SERVER_TIMING_QUERIES.search(response.getheader('Server-Timing', ''))
+    return int(match.group(1)) if match else 0
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, queries, status):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            self.queries[route].append(queries)
+            if status >= 500:
+                self.errors[route] += 1
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+class Fixtures:
+    """IDs sampled from the database that the tasks pick from"""
+
+    def __init__(self, users, seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            def column(sql, **params):
+                return db.session.execute(text(sql), params).scalars().all()
+            self.patients = column("SELECT patientid FROM patient ORDER BY random() LIMIT 2000")
+            self.admissions = column("SELECT admissionid FROM admission ORDER BY admissionid DESC LIMIT 2000")
+            self.active = column("SELECT admissionid FROM admission WHERE dischargedate IS NULL LIMIT 500")
+            self.doctors = column("SELECT username FROM doctordetails")
+            self.departments = column("SELECT deptid FROM department")
+            self.admission_types = column("SELECT admissiontypeid FROM admissiontype")
+            free = column("SELECT patientid FROM patient p WHERE NOT EXISTS ("
+                          "  SELECT 1 FROM admission a WHERE a.patient = p.patientid AND a.dischargedate IS NULL)"
+                          " ORDER BY patientid LIMIT :n", n=users * 20)
+        if not (self.patients and self.admissions and self.doctors and self.departments and self.admission_types):
+            raise SystemExit('The database is empty; run generate_data.py first')
+        rng.shuffle(free)
+        # Each user admits only its own patients so users never collide
+        self.free_patients = [free[i::users] for i in range(users)]
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, port, credentials, fixtures, results, tasks, think_time, deadline, seed):
+        super().__init__(daemon=True)
+        self.index = index
+        self.port = port
+        self.credentials = credentials
+        self.fixtures = fixtures
+        self.results = results
+        self.tasks = tasks
+        self.think_time = think_time
+        self.deadline = deadline
+        self.rng = random.Random(seed * 1000 + index)
+        self.free_patients = list(fixtures.free_patients[index])
+        self.my_admissions = []
+        self.cookie = None
+        self.conn = None
+
+    def request(self, method, path, body=None, form=None):
+        headers = {'Cookie': self.cookie} if self.cookie else {}
+        payload = None
+        if form is not None:
+            payload = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, ConnectionError):
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port)
+            self.results.record(f'{method} {path}', time.perf_counter() - started, 0, 599)
+            return 599, b'', None
+        elapsed = time.perf_counter() - started
+        route = response.getheader('X-Loadtest-Route', f'{method} {path}')
+        self.results.record(route, elapsed, query_count(response), response.status)
+        if response.getheader('Connection', '').lower() == 'close':
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.port)
+        return response.status, data, response
+
+    def json(self, method, path, body=None):
+        status, data, _ = self.request(method, path, body)
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def login(self):
+        self.conn = http.client.HTTPConnection('127.0.0.1', self.port)
+        self.request('GET', '/login')
+        status, _, response = self.request('POST', '/login', form={
+            'loginid': self.credentials[0], 'passid': self.credentials[1]})
+        cookie = response.getheader('Set-Cookie') if response else None
+        if not cookie:
+            raise SystemExit('Login failed; check --username/--password')
+        self.cookie = cookie.split(';', 1)[0]
+
+    def run(self):
+        self.login()
+        names = [task for task, _ in self.tasks]
+        weights = [weight for _, weight in self.tasks]
+        while time.monotonic() < self.deadline:
+            task = self.rng.choices(names, weights)[0]
+            getattr(self, task)()
+            time.sleep(self.rng.expovariate(1 / self.think_time) if self.think_time else 0)
+        # Leave no admissions from the run behind
+        for admission_id in self.my_admissions:
+            self.request('POST', f'/api/admissions/{admission_id}/discharge', body={})
+
+    # --- tasks -----------------------------------------------------------
+
+    def pick(self, values):
+        return self.rng.choice(values)
+
+    def dashboard_poll(self):
+        self.request('GET', '/api/dashboard/stats')
+        self.request('GET', '/api/dashboard/recent-activities')
+        self.request('GET', '/api/dashboard/alerts')
+        self.request('GET', '/api/recent-admissions?filter=' + self.pick(['all', 'active', 'today']))
+
+    def statistics(self):
+        for name in ('patients', 'admissions', 'doctors', 'departments', 'beds', 'revenue',
+                     'doctors/count', 'departments/count'):
+            self.request('GET', f'/api/statistics/{name}')
+
+    def pages(self):
+        self.request('GET', self.pick(['/', '/dashboard', '/patients', '/doctors', '/departments',
+                                       '/admissions', '/reports']))
+
+    def list_views(self):
+        self.request('GET', self.pick([
+            '/api/patients', '/api/patients?name=' + self.pick(['an', 'li', 'mar', 'son']),
+            '/api/admissions', '/api/admissions?status=active',
+            f'/api/admissions?department={self.pick(self.fixtures.departments)}',
+            f'/api/admissions?doctor={self.pick(self.fixtures.doctors)}',
+            '/api/doctors', '/api/departments', '/api/admission-types'
+        ]))
+
+    def detail_views(self):
+        admission_id = self.pick(self.fixtures.admissions)
+        self.request('GET', self.pick([
+            f'/patients/{self.pick(self.fixtures.patients)}',
+            f'/doctors/{self.pick(self.fixtures.doctors)}',
+            f'/admissions/{admission_id}',
+            f'/api/admissions/{admission_id}',
+            f'/api/admissions/{admission_id}/details',
+            f'/api/admissions/{admission_id}/medical-details',
+            f'/api/admissions/{admission_id}/notes'
+        ]))
+
+    def admit_or_discharge(self):
+        if self.my_admissions and (not self.free_patients or self.rng.random() < 0.5):
+            admission_id = self.my_admissions.pop(0)
+            self.request('POST', f'/api/admissions/{admission_id}/discharge', body={})
+            return
+        if not self.free_patients:
+            return
+        patient = self.free_patients.pop(0)
+        status, body = self.json('POST', '/api/admissions', {
+            'patient_id': patient,
+            'department_id': self.pick(self.fixtures.departments),
+            'doctor_username': self.pick(self.fixtures.doctors),
+            'admission_type_id': self.pick(self.fixtures.admission_types),
+            'condition': 'Load test admission',
+            'fee': self.rng.randint(300, 5000)
+        })
+        if status == 201 and body:
+            self.my_admissions.append(body['id'])
+        self.free_patients.append(patient)
+
+    def record_vitals(self):
+        admissions = self.my_admissions or self.fixtures.active or self.fixtures.admissions
+        admission_id = self.pick(admissions)
+        self.request('POST', f'/api/admissions/{admission_id}/details', body={
+            'temperature': round(self.rng.gauss(37, 0.4), 1),
+            'blood_pressure': f'{self.rng.randint(105, 145)}/{self.rng.randint(65, 95)}',
+            'pulse_rate': self.rng.randint(55, 110),
+            'notes': 'Load test reading'
+        })
+        if self.rng.random() < 0.3:
+            self.request('PUT', f'/api/admissions/{admission_id}/medical-details', body={
+                'diagnosis': 'Load test diagnosis', 'symptoms': 'Fever', 'treatment': 'Observation',
+                'medications': 'Paracetamol', 'notes': 'Load test'
+            })
+            self.request('POST', f'/api/admissions/{admission_id}/notes', body={'note': 'Load test'})
+
+    def maintain_records(self):
+        status, body = self.json('POST', '/api/patients', {'name': f'Loadtest Patient {self.index}',
+                                                           'condition': 'Synthetic'})
+        if status in (200, 201) and body and body.get('id'):
+            self.request('PUT', f"/api/patients/{body['id']}", body={'condition': 'Updated'})
+            self.request('DELETE', f"/api/patients/{body['id']}")
+        username = f'dr.loadtest{self.index}'
+        status, _ = self.json('POST', '/api/doctors', {'username': username, 'password': 'x',
+                                                       'name': 'Dr. Load Test'})
+        if status in (200, 201):
+            self.request('PUT', f'/api/doctors/{username}', body={'email': f'{username}@hospital.com'})
+            self.request('DELETE', f'/api/doctors/{username}')
+        status, body = self.json('POST', '/api/departments', {'name': f'Loadtest Ward {self.index}',
+                                                              'capacity': 5})
+        if status in (200, 201) and body and body.get('id'):
+            self.request('PUT', f"/api/departments/{body['id']}", body={'capacity': 6})
+            self.request('DELETE', f"/api/departments/{body['id']}")
+
+    def reports(self):
+        kind = self.pick(['admissions', 'revenue'])
+        status, job = self.json('GET', f'/api/reports/{kind}?start_date=2026-01-01&end_date=2026-02-01')
+        if job and job.get('status_url'):
+            status, job = self.json('GET', job['status_url'])
+            if job and job.get('result_url'):
+                self.request('GET', job['result_url'])
+        self.request('GET', '/api/reports/departments')
+        self.request('POST', '/api/reports/generate', body={
+            'type': self.pick(['patient', 'department']), 'format': 'csv', 'range': 'week'})
+
+    def operations(self):
+        self.request('GET', self.pick(['/health/live', '/health/ready', '/api/metrics/pool',
+                                       '/api/statistics/cache', '/login', '/api/test-data']))
+
+
+# task name and relative weight
+DEFAULT_MIX = [
+    ('dashboard_poll', 30),
+    ('statistics', 8),
+    ('pages', 8),
+    ('list_views', 20),
+    ('detail_views', 20),
+    ('admit_or_discharge', 6),
+    ('record_vitals', 6),
+    ('maintain_records', 1),
+    ('reports', 1),
+    ('operations', 2),
+]
+
+
+def print_report(results, elapsed):
+    print(f"{'Route':<58} {'Reqs':>6} {'Err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'Q/req':>6} {'Qmax':>5}")
+    total = 0
+    for route in sorted(results.latencies):
+        latencies = sorted(results.latencies[route])
+        queries = results.queries[route]
+        total += len(latencies)
+        print(f"{route[:58]:<58} {len(latencies):>6} {results.errors[route]:>4} "
+              f"{percentile(latencies, 0.50) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.1f} {sum(queries) / len(queries):>6.1f} "
+              f"{max(queries):>5}")
+    print(f"\n{total:,} requests in {elapsed:.1f}s ({total / elapsed:,.1f} req/s)")
+    routes = {f'{method} {rule.rule}' for rule in app.url_map.iter_rules() if rule.endpoint != 'static'
+              for method in rule.methods - {'HEAD', 'OPTIONS'}}
+    missed = sorted(route for route in routes - set(results.latencies) - EXCLUDED_ROUTES
+                    if ' /debug/' not in route)
+    if missed:
+        print("Not exercised: " + ', '.join(missed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a realistic request mix and report per-route latency')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--duration', type=int, default=60, help='seconds')
+    parser.add_argument('--think-time', type=float, default=0.5, help='mean seconds between tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--log-level', default='WARNING', help="the app's log level during the run")
+    parser.add_argument('--json', help='also write the raw per-route results to this file')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    for name in ('app', 'werkzeug'):
+        logging.getLogger(name).setLevel(args.log_level)
+    app.after_request(tag_route)
+    fixtures = Fixtures(args.users, args.seed)
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = Results()
+    started = time.monotonic()
+    users = [VirtualUser(i, args.port, (args.username, args.password), fixtures, results, DEFAULT_MIX,
+                         args.think_time, started + args.duration, args.seed) for i in range(args.users)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - started
+
+    print(f"\nLoad test: {args.users} users, {args.duration}s, think time {args.think_time}s")
+    print("=" * 104)
+    print_report(results, elapsed)
+    print("=" * 104)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({route: {'latencies': results.latencies[route], 'queries': results.queries[route],
+                               'errors': results.errors[route]} for route in results.latencies}, f)
+    server.shutdown()
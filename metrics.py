@@ -0,0 +1,107 @@
+import math
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def format_metric(name, metric_type, help_text, samples):
+    """Prometheus text exposition of one metric family.
+
+    ``samples`` are ``(suffix, labels, value)`` tuples; the suffix is
+    appended to ``name`` (``_bucket``, ``_sum``...) and may be empty.
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    for suffix, labels, value in samples:
+        lines.append(f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return format_metric(self.name, 'counter', self.help_text, [
+            ('', dict(zip(self.labelnames, key)), value) for key, value in values
+        ])
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            series['count'] += 1
+            series['sum'] += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+                    break
+
+    def render(self):
+        with self._lock:
+            series = sorted((key, dict(s, buckets=list(s['buckets']))) for key, s in self._series.items())
+        samples = []
+        for key, s in series:
+            labels = dict(zip(self.labelnames, key))
+            samples.extend(histogram_samples(labels, zip(self.buckets, s['buckets']), s['count'], s['sum'],
+                                             cumulative=False))
+        return format_metric(self.name, 'histogram', self.help_text, samples)
+
+
+def histogram_samples(labels, buckets, count, total, cumulative=True):
+    """``_bucket``/``_sum``/``_count`` samples from ``(upper bound, count)``
+    pairs, which are per-bucket unless ``cumulative``."""
+    samples, running = [], 0
+    for bound, bucket_count in buckets:
+        running = bucket_count if cumulative else running + bucket_count
+        samples.append(('_bucket', dict(labels, le=format_value(float(bound))), running))
+    samples.append(('_bucket', dict(labels, le='+Inf'), count))
+    samples.append(('_sum', labels, total))
+    samples.append(('_count', labels, count))
+    return samples
@@ -0,0 +1,107 @@
+"""Initial schema
+
+Creates the tables of database.txt, with the same columns and types
+(init_db.py creates the first seven and leaves admissiondetails and
+medical_details to ``db.metadata.create_all``). Databases that were set up
+from those scripts should be marked as already at this revision with
+``alembic stamp 0001`` before running ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'admini',
+        sa.Column('loginid', sa.String(50), primary_key=True),
+        sa.Column('passid', sa.String(50), nullable=False),
+    )
+    op.create_table(
+        'doctordetails',
+        sa.Column('username', sa.String(50), sa.ForeignKey('admini.loginid'), primary_key=True),
+        sa.Column('doctorname', sa.String(100), nullable=False),
+        sa.Column('email', sa.String(100)),
+    )
+    op.create_table(
+        'department',
+        sa.Column('deptid', sa.Integer, primary_key=True),
+        sa.Column('deptname', sa.String(100), unique=True, nullable=False),
+    )
+    op.create_table(
+        'department_capacity',
+        sa.Column('deptid', sa.Integer, sa.ForeignKey('department.deptid', ondelete='CASCADE'), primary_key=True),
+        sa.Column('beds', sa.Integer, nullable=False),
+    )
+    op.create_table(
+        'admissiontype',
+        sa.Column('admissiontypeid', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('admissiontypename', sa.String(50), unique=True, nullable=False),
+    )
+    op.create_table(
+        'patient',
+        sa.Column('patientid', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('patientname', sa.String(100), nullable=False),
+        sa.Column('condition', sa.Text),
+    )
+    op.create_table(
+        'admission',
+        sa.Column('admissionid', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('admissiontype', sa.Integer, sa.ForeignKey('admissiontype.admissiontypeid')),
+        sa.Column('department', sa.Integer, sa.ForeignKey('department.deptid')),
+        sa.Column('patient', sa.Integer, sa.ForeignKey('patient.patientid')),
+        sa.Column('administrator', sa.String(50), sa.ForeignKey('doctordetails.username')),
+        sa.Column('condition', sa.Text),
+        sa.Column('admissiondate', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('dischargedate', sa.DateTime(timezone=True)),
+        sa.Column('fee', sa.Numeric(10, 2)),
+    )
+    op.create_table(
+        'admissiondetails',
+        sa.Column('detailid', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('admissionid', sa.Integer, sa.ForeignKey('admission.admissionid'), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True)),
+        sa.Column('temperature', sa.Numeric(4, 1)),
+        sa.Column('blood_pressure', sa.String(20)),
+        sa.Column('pulse_rate', sa.Integer),
+        sa.Column('notes', sa.Text),
+        sa.Column('recorded_by', sa.String(50), sa.ForeignKey('doctordetails.username')),
+    )
+    op.create_table(
+        'medical_details',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('admission_id', sa.Integer, sa.ForeignKey('admission.admissionid'), nullable=False),
+        sa.Column('diagnosis', sa.Text),
+        sa.Column('symptoms', sa.Text),
+        sa.Column('treatment', sa.Text),
+        sa.Column('medications', sa.Text),
+        sa.Column('notes', sa.Text),
+        sa.Column('next_checkup', sa.DateTime(timezone=True)),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('medical_details')
+    op.drop_table('admissiondetails')
+    op.drop_table('admission')
+    op.drop_table('patient')
+    op.drop_table('admissiontype')
+    op.drop_table('department_capacity')
+    op.drop_table('department')
+    op.drop_table('doctordetails')
+    op.drop_table('admini')
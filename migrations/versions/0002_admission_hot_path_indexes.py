@@ -0,0 +1,58 @@
+"""Admission hot-path indexes
+
+Partial indexes over active admissions (``dischargedate IS NULL``) for the
+per-department, per-doctor and per-patient lookups, plus composite btrees
+leading with the same columns and ``admissiondate`` for the date-range and
+history queries. The plain single-column indexes that older copies of
+database.txt created are superseded by these and dropped if present.
+
+Indexes are built CONCURRENTLY so the admission table stays writable, and
+only if missing: database.txt creates them too.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text('dischargedate IS NULL')
+
+INDEXES = [
+    ('ix_admission_active_department', ['department'], ACTIVE),
+    ('ix_admission_active_administrator', ['administrator'], ACTIVE),
+    ('ix_admission_active_patient', ['patient'], ACTIVE),
+    ('ix_admission_admissiondate', ['admissiondate', 'admissionid'], None),
+    ('ix_admission_department_admissiondate', ['department', 'admissiondate'], None),
+    ('ix_admission_administrator_admissiondate', ['administrator', 'admissiondate'], None),
+    ('ix_admission_patient_admissiondate', ['patient', 'admissiondate'], None),
+]
+
+LEGACY_INDEXES = ['idx_admission_patient', 'idx_admission_department', 'idx_admission_date']
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(name, 'admission', columns,
+                            postgresql_where=where,
+                            postgresql_concurrently=True,
+                            if_not_exists=True)
+        for name in LEGACY_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='admission', postgresql_concurrently=True)
@@ -0,0 +1,48 @@
+"""Report jobs table
+
+Tracks reports generated in the background process pool. The partial unique
+index allows only one queued or running job per ``cache_key`` so identical
+concurrent requests are folded onto a single job.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_job',
+        sa.Column('jobid', sa.String(32), primary_key=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('params', sa.Text, nullable=False),
+        sa.Column('cache_key', sa.String(64), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('progress', sa.Integer, nullable=False),
+        sa.Column('error', sa.Text),
+        sa.Column('requested_by', sa.String(50)),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_report_job_pending_cache_key', 'report_job', ['cache_key'], unique=True,
+                    postgresql_where=sa.text("status IN ('queued', 'running')"))
+    op.create_index('ix_report_job_cache_key_created', 'report_job', ['cache_key', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_job_cache_key_created', table_name='report_job')
+    op.drop_index('ix_report_job_pending_cache_key', table_name='report_job')
+    op.drop_table('report_job')
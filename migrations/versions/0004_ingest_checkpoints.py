@@ -0,0 +1,39 @@
+"""Ingest checkpoints table
+
+One row per bulk-ingest source file recording how many input records have
+been consumed. ingest_admissions.py updates it in the same transaction as
+each COPY batch, so an interrupted load resumes exactly after the last
+committed batch.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ingest_checkpoint',
+        sa.Column('source', sa.String(255), primary_key=True),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('position', sa.BigInteger, nullable=False),
+        sa.Column('rows_loaded', sa.BigInteger, nullable=False),
+        sa.Column('rows_rejected', sa.BigInteger, nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ingest_checkpoint')
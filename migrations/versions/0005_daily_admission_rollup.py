@@ -0,0 +1,62 @@
+"""Daily admission rollup table
+
+Admissions, revenue, discharges and patient-days per day, department and
+admission type, so trend and revenue endpoints read a few hundred rows
+instead of scanning admission. The table is filled from the existing
+admissions here; afterwards the app and ingest_admissions.py keep it
+current (see rollup.py, which can also rebuild any date range).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# rollup.backfill() as of this revision, over every admission
+BACKFILL = """
+    INSERT INTO daily_admission_rollup
+        (day, department, admission_type, admissions, revenue, discharges, patient_days)
+    SELECT day, department, admission_type, sum(admissions), sum(revenue), sum(discharges), sum(patient_days)
+    FROM (
+        SELECT a.admissiondate::date, coalesce(a.department, 0), coalesce(a.admissiontype, 0),
+               count(*), coalesce(sum(a.fee), 0), 0, 0
+        FROM admission a
+        GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT a.dischargedate::date, coalesce(a.department, 0), coalesce(a.admissiontype, 0),
+               0, 0, count(*), sum(round(extract(epoch from a.dischargedate - a.admissiondate) / 86400, 6))
+        FROM admission a WHERE a.dischargedate IS NOT NULL
+        GROUP BY 1, 2, 3
+    ) t (day, department, admission_type, admissions, revenue, discharges, patient_days)
+    GROUP BY day, department, admission_type
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_admission_rollup',
+        sa.Column('day', sa.Date, primary_key=True),
+        sa.Column('department', sa.Integer, primary_key=True),
+        sa.Column('admission_type', sa.Integer, primary_key=True),
+        sa.Column('admissions', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('discharges', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('patient_days', sa.Numeric(16, 6), nullable=False, server_default='0'),
+    )
+
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_admission_rollup')
@@ -0,0 +1,61 @@
+"""Patient search
+
+Adds what /api/patients/search needs (see search.py): a stored tsvector
+of each patient's name and condition with a GIN index, a C-collation
+btree for name prefixes, and the patient_search_word vocabulary with a
+pg_trgm index for typo-tolerant word lookups. The pg_trgm extension is
+created if missing and the vocabulary is filled from the existing
+patients.
+
+Adding the stored column rewrites the patient table; the indexes are then
+built CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# search.DOCUMENT as of this revision
+DOCUMENT = ("setweight(to_tsvector('simple', coalesce(patientname, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(condition, '')), 'B')")
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('patient', sa.Column('search_document', TSVECTOR, sa.Computed(DOCUMENT, persisted=True)))
+    op.create_table(
+        'patient_search_word',
+        sa.Column('word', sa.Text(collation='C'), primary_key=True),
+        sa.Column('patients', sa.Integer, nullable=False, server_default='0'),
+    )
+    op.create_index('ix_patient_search_word_trgm', 'patient_search_word', ['word'],
+                    postgresql_using='gin', postgresql_ops={'word': 'gin_trgm_ops'})
+    op.execute("INSERT INTO patient_search_word (word, patients) "
+               "SELECT word, ndoc FROM ts_stat('SELECT search_document FROM patient')")
+    with op.get_context().autocommit_block():
+        op.create_index('ix_patient_name_prefix', 'patient',
+                        [sa.text('lower(patientname) COLLATE "C"'), 'patientid'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_patient_search_document', 'patient', ['search_document'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_patient_search_document', table_name='patient', postgresql_concurrently=True)
+        op.drop_index('ix_patient_name_prefix', table_name='patient', postgresql_concurrently=True)
+    op.drop_table('patient_search_word')
+    op.drop_column('patient', 'search_document')
@@ -0,0 +1,46 @@
+"""Vitals time series
+
+Adds ``systolic`` and ``diastolic`` to admissiondetails, generated from
+the free-text ``blood_pressure`` (NULL where it is not ``S/D``), and an
+``(admissionid, timestamp, detailid)`` index so the windowed vitals
+queries in vitals.py read one index range per admission.
+
+Adding the stored columns rewrites the admissiondetails table; the index
+is then built CONCURRENTLY.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# vitals.SYSTOLIC and vitals.DIASTOLIC as of this revision
+SYSTOLIC = r"CAST(substring(blood_pressure FROM '^\s*(\d{2,3})\s*/\s*\d{2,3}\s*$') AS smallint)"
+DIASTOLIC = r"CAST(substring(blood_pressure FROM '^\s*\d{2,3}\s*/\s*(\d{2,3})\s*$') AS smallint)"
+
+
+def upgrade() -> None:
+    op.add_column('admissiondetails', sa.Column('systolic', sa.SmallInteger, sa.Computed(SYSTOLIC, persisted=True)))
+    op.add_column('admissiondetails', sa.Column('diastolic', sa.SmallInteger, sa.Computed(DIASTOLIC, persisted=True)))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_admissiondetails_admission_timestamp', 'admissiondetails',
+                        ['admissionid', 'timestamp', 'detailid'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_admissiondetails_admission_timestamp', table_name='admissiondetails',
+                      postgresql_concurrently=True)
+    op.drop_column('admissiondetails', 'diastolic')
+    op.drop_column('admissiondetails', 'systolic')
@@ -0,0 +1,49 @@
+"""Department statistics materialized view
+
+Adds ``department_stats``, per-department admission totals, revenue and
+average stay (see department_stats.py), with a unique index on ``deptid``
+so the app can refresh it CONCURRENTLY. The view is populated when it is
+created.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# department_stats.CREATE_VIEW as of this revision
+CREATE_VIEW = [
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS department_stats AS
+    SELECT d.deptid,
+           count(a.admissionid) AS total_admissions,
+           count(a.dischargedate) AS discharged_patients,
+           coalesce(sum(a.fee), 0) AS total_revenue,
+           coalesce(sum(a.fee) FILTER (WHERE a.admissiondate >= date_trunc('month', now())), 0) AS monthly_revenue,
+           round(avg(extract(epoch FROM a.dischargedate - a.admissiondate)) / 86400, 2) AS avg_stay_days,
+           now() AS refreshed_at
+    FROM department d
+    LEFT JOIN admission a ON a.department = d.deptid
+    GROUP BY d.deptid
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_department_stats_deptid ON department_stats (deptid)",
+]
+
+
+def upgrade() -> None:
+    for statement in CREATE_VIEW:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS department_stats")
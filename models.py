@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from flask_login import UserMixin
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from department_stats import CREATE_VIEW as CREATE_DEPARTMENT_STATS, DROP_VIEW as DROP_DEPARTMENT_STATS
+from search import DOCUMENT as SEARCH_DOCUMENT
+from vitals import DIASTOLIC, SYSTOLIC
+
+# Unbound here: create_app() attaches it to the Flask app, and scripts can
+# use the mapped classes with a plain session from database.py.
+db = SQLAlchemy()
+
+# Models
+class Admin(UserMixin, db.Model):
+    __tablename__ = 'admini'
+    loginid = db.Column(db.String(50), primary_key=True)
+    passid = db.Column(db.String(50), nullable=False)
+
+    def get_id(self):
+        return str(self.loginid)  # PostgreSQL needs string IDs
+
+class Doctor(db.Model):
+    __tablename__ = 'doctordetails'
+    username = db.Column(db.String(50), db.ForeignKey('admini.loginid'), primary_key=True)
+    doctorname = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100))
+
+class Department(db.Model):
+    __tablename__ = 'department'
+    deptid = db.Column(db.Integer, primary_key=True)
+    deptname = db.Column(db.String(100), unique=True, nullable=False)
+
+class DepartmentCapacity(db.Model):
+    __tablename__ = 'department_capacity'
+    deptid = db.Column(db.Integer, db.ForeignKey('department.deptid', ondelete='CASCADE'), primary_key=True)
+    beds = db.Column(db.Integer, nullable=False)
+
+class Patient(db.Model):
+    __tablename__ = 'patient'
+    # Kept in sync with migrations/versions/0006_patient_search.py; queried by search.py
+    __table_args__ = (
+        db.Index('ix_patient_name_prefix', text('lower(patientname) COLLATE "C"'), 'patientid'),
+        db.Index('ix_patient_search_document', 'search_document', postgresql_using='gin'),
+    )
+    patientid = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    patientname = db.Column(db.String(100), nullable=False)
+    condition = db.Column(db.Text)
+    search_document = db.deferred(db.Column(TSVECTOR, db.Computed(SEARCH_DOCUMENT, persisted=True)))
+
+class PatientSearchWord(db.Model):
+    __tablename__ = 'patient_search_word'
+    # Kept in sync with migrations/versions/0006_patient_search.py; maintained by search.py
+    __table_args__ = (
+        db.Index('ix_patient_search_word_trgm', 'word', postgresql_using='gin',
+                 postgresql_ops={'word': 'gin_trgm_ops'}),
+    )
+    word = db.Column(db.Text(collation='C'), primary_key=True)
+    patients = db.Column(db.Integer, nullable=False, default=0)
+
+# The trigram index needs pg_trgm before the table is created
+event.listen(PatientSearchWord.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+class Admission(db.Model):
+    __tablename__ = 'admission'
+    # Kept in sync with migrations/versions/0002_admission_hot_path_indexes.py
+    __table_args__ = (
+        db.Index('ix_admission_active_department', 'department', postgresql_where=text('dischargedate IS NULL')),
+        db.Index('ix_admission_active_administrator', 'administrator', postgresql_where=text('dischargedate IS NULL')),
+        db.Index('ix_admission_active_patient', 'patient', postgresql_where=text('dischargedate IS NULL')),
+        db.Index('ix_admission_admissiondate', 'admissiondate', 'admissionid'),
+        db.Index('ix_admission_department_admissiondate', 'department', 'admissiondate'),
+        db.Index('ix_admission_administrator_admissiondate', 'administrator', 'admissiondate'),
+        db.Index('ix_admission_patient_admissiondate', 'patient', 'admissiondate'),
+    )
+    admissionid = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    admissiontype = db.Column(db.Integer, db.ForeignKey('admissiontype.admissiontypeid'))
+    department = db.Column(db.Integer, db.ForeignKey('department.deptid'))
+    patient = db.Column(db.Integer, db.ForeignKey('patient.patientid'))
+    administrator = db.Column(db.String(50), db.ForeignKey('doctordetails.username'))
+    condition = db.Column(db.Text)
+    admissiondate = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+    dischargedate = db.Column(db.DateTime(timezone=True))
+    fee = db.Column(db.Numeric(10, 2))
+
+class AdmissionType(db.Model):
+    __tablename__ = 'admissiontype'
+    admissiontypeid = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    admissiontypename = db.Column(db.String(50), unique=True, nullable=False)
+
+class AdmissionDetails(db.Model):
+    __tablename__ = 'admissiondetails'
+    # Kept in sync with migrations/versions/0007_vitals_time_series.py; queried by vitals.py
+    __table_args__ = (
+        db.Index('ix_admissiondetails_admission_timestamp', 'admissionid', 'timestamp', 'detailid'),
+    )
+    detailid = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    admissionid = db.Column(db.Integer, db.ForeignKey('admission.admissionid'), nullable=False)
+    timestamp = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+    temperature = db.Column(db.Numeric(4, 1))
+    blood_pressure = db.Column(db.String(20))
+    systolic = db.Column(db.SmallInteger, db.Computed(SYSTOLIC, persisted=True))
+    diastolic = db.Column(db.SmallInteger, db.Computed(DIASTOLIC, persisted=True))
+    pulse_rate = db.Column(db.Integer)
+    notes = db.Column(db.Text)
+    recorded_by = db.Column(db.String(50), db.ForeignKey('doctordetails.username'))
+
+class MedicalDetails(db.Model):
+    __tablename__ = 'medical_details'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    admission_id = db.Column(db.Integer, db.ForeignKey('admission.admissionid'), nullable=False)
+    diagnosis = db.Column(db.Text)
+    symptoms = db.Column(db.Text)
+    treatment = db.Column(db.Text)
+    medications = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    next_checkup = db.Column(db.DateTime(timezone=True))
+    created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ReportJob(db.Model):
+    __tablename__ = 'report_job'
+    # Kept in sync with migrations/versions/0003_report_jobs.py
+    __table_args__ = (
+        # At most one pending job per distinct report request
+        db.Index('ix_report_job_pending_cache_key', 'cache_key', unique=True,
+                 postgresql_where=text("status IN ('queued', 'running')")),
+        db.Index('ix_report_job_cache_key_created', 'cache_key', 'created_at'),
+    )
+    jobid = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False)
+    cache_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = db.Column(db.DateTime(timezone=True))
+
+class IngestCheckpoint(db.Model):
+    __tablename__ = 'ingest_checkpoint'
+    # Kept in sync with migrations/versions/0004_ingest_checkpoints.py
+    source = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    position = db.Column(db.BigInteger, nullable=False, default=0)
+    rows_loaded = db.Column(db.BigInteger, nullable=False, default=0)
+    rows_rejected = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class DailyAdmissionRollup(db.Model):
+    __tablename__ = 'daily_admission_rollup'
+    # Kept in sync with migrations/versions/0005_daily_admission_rollup.py;
+    # maintained by rollup.py. department/admission_type are 0 when unknown.
+    day = db.Column(db.Date, primary_key=True)
+    department = db.Column(db.Integer, primary_key=True)
+    admission_type = db.Column(db.Integer, primary_key=True)
+    admissions = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    discharges = db.Column(db.Integer, nullable=False, default=0)
+    patient_days = db.Column(db.Numeric(16, 6), nullable=False, default=0)
+
+# department_stats is a materialized view over admission (department_stats.py);
+# kept in sync with migrations/versions/0008_department_stats_view.py
+for statement in CREATE_DEPARTMENT_STATS:
+    event.listen(db.metadata, 'after_create', DDL(statement))
+event.listen(db.metadata, 'before_drop', DDL(DROP_DEPARTMENT_STATS))
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class OccupancyIndex:
+    """In-process count of active admissions per department.
+
+    Routes that admit or discharge a patient call ``admit``/``discharge``
+    once their transaction has committed, so reads never need a COUNT over
+    the admission table. Because other processes (or the helper scripts)
+    can write to the database directly, the whole index is reloaded from
+    the database once it is older than ``reconcile_interval`` seconds.
+    """
+
+    def __init__(self, reconcile_interval=300):
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.RLock()
+        self._departments = {}
+        self._loaded_at = None
+
+    def load(self, departments):
+        """Replace the index with ``(deptid, name, capacity, active)`` rows"""
+        with self._lock:
+            self._departments = {
+                deptid: {'id': deptid, 'name': name, 'capacity': capacity, 'active': active}
+                for deptid, name, capacity, active in departments
+            }
+            self._loaded_at = time.monotonic()
+
+    def is_stale(self):
+        with self._lock:
+            return (self._loaded_at is None or
+                    time.monotonic() - self._loaded_at >= self.reconcile_interval)
+
+    def age(self):
+        """Seconds since the last load, or None before the first one"""
+        with self._lock:
+            return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def invalidate(self):
+        """Force a reload from the database on the next read"""
+        with self._lock:
+            self._loaded_at = None
+
+    def admit(self, deptid):
+        self._adjust(deptid, 1)
+
+    def discharge(self, deptid):
+        self._adjust(deptid, -1)
+
+    def _adjust(self, deptid, delta):
+        with self._lock:
+            dept = self._departments.get(deptid)
+            if dept is None:
+                # Department created since the last load
+                self._loaded_at = None
+                return
+            dept['active'] = max(0, dept['active'] + delta)
+
+    def departments(self):
+        """Snapshot of every department ordered by id"""
+        with self._lock:
+            return [dict(self._departments[deptid]) for deptid in sorted(self._departments)]
+
+    def department(self, deptid):
+        with self._lock:
+            dept = self._departments.get(deptid)
+            return dict(dept) if dept else None
+
+    def totals(self):
+        """Return ``(total_beds, occupied_beds)`` across all departments"""
+        with self._lock:
+            return (sum(d['capacity'] for d in self._departments.values()),
+                    sum(d['active'] for d in self._departments.values()))
+
+
+def occupancy_percent(active, capacity):
+    if not capacity:
+        return 0.0
+    return round((active / capacity) * 100, 1)
@@ -0,0 +1,40 @@
+"""Page sizes and opaque keyset cursors for the paginated endpoints.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and then
+base64url-encoded, so clients pass it back unchanged to get the next page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+MAX_PAGE_SIZE = 500  # Hard server-side cap on rows returned per page
+
+
+def parse_page_limit(value, default):
+    """Parse a ``limit`` query parameter, clamped to ``MAX_PAGE_SIZE``"""
+    try:
+        limit = int(value) if value else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by ``encode_cursor`` back into its sort key"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed cursor: {cursor}") from e
+
+
+def decode_admission_cursor(cursor):
+    """``(admissiondate, admissionid)`` of an admission-list cursor; raises
+    ValueError or TypeError when malformed"""
+    cursor_date, cursor_id = decode_cursor(cursor)
+    return datetime.fromisoformat(cursor_date), int(cursor_id)
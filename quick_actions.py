@@ -1,28 +1,70 @@
-from app import app, db, Patient, Admission, Department, Doctor, AdmissionType
+from database import session_scope
+from models import Patient, Admission, Department, Doctor, AdmissionType
 from datetime import datetime
+import rollup
+from search import count_words, search_patients
+
+# Returned by choose_patient when the user asks to register a new patient
+NEW_PATIENT = object()
+
+def choose_patient(session, patient_name, admitted=None, allow_new=False):
+    """
+    Find a patient through the ranked patient search. A single exact name
+    match is used directly; otherwise the matches are listed and the user
+    picks one, being asked again until the choice is on the list. Returns
+    the Patient, or None when nothing matched or the user cancelled. With
+    allow_new, returns NEW_PATIENT when nothing matched or the user chose
+    0 to register a new patient.
+    """
+    matches = search_patients(session, patient_name, limit=10, admitted=admitted)
+    exact = [m for m in matches if m.patientname.lower() == ' '.join(patient_name.lower().split())]
+    if len(exact) == 1:
+        return session.get(Patient, exact[0].patientid)
+    if not matches:
+        return NEW_PATIENT if allow_new else None
+
+    print(f"\nPatients matching '{patient_name}':")
+    for number, match in enumerate(matches, 1):
+        status = 'admitted' if match.admission_id else 'not admitted'
+        print(f"{number:>3}. {match.patientname} (ID {match.patientid}) - {match.condition or '-'} - {status}")
+    print(f"  0. {'Register a new patient' if allow_new else 'Cancel'}")
+    while True:
+        choice = input("Choose a patient (Enter to cancel): ").strip()
+        if not choice:
+            return None
+        if choice.isdigit() and 0 <= int(choice) <= len(matches):
+            break
+        print(f"Please enter a number from 0 to {len(matches)}")
+    if int(choice) == 0:
+        return NEW_PATIENT if allow_new else None
+    return session.get(Patient, matches[int(choice) - 1].patientid)
 
 def quick_admit_patient(patient_name, department_name, doctor_username, condition, fee):
     """
     Quick action to admit a patient by name and department name instead of IDs.
     """
-    with app.app_context():
+    with session_scope() as session:
         try:
             # Find department by name
-            department = Department.query.filter_by(deptname=department_name).first()
+            department = session.query(Department).filter_by(deptname=department_name).first()
             if not department:
                 raise ValueError(f"Department '{department_name}' not found")
 
             # Find doctor by username
-            doctor = Doctor.query.get(doctor_username)
+            doctor = session.get(Doctor, doctor_username)
             if not doctor:
                 raise ValueError(f"Doctor with username '{doctor_username}' not found")
 
             # Create new patient if doesn't exist
-            patient = Patient.query.filter_by(patientname=patient_name).first()
-            if not patient:
+            patient = choose_patient(session, patient_name, allow_new=True)
+            if patient is None:
+                raise ValueError(f"No patient matching '{patient_name}' selected")
+            if patient is NEW_PATIENT:
                 patient = Patient(patientname=patient_name, condition=condition)
-                db.session.add(patient)
-                db.session.commit()
+                session.add(patient)
+                session.flush()
+                count_words(session, patient.patientid)
+                session.commit()
 
             # Create new admission
             new_admission = Admission(
@@ -36,8 +78,10 @@ def quick_admit_patient(patient_name, department_name, doctor_username, conditio
                 fee=fee
             )
 
-            db.session.add(new_admission)
-            db.session.commit()
+            session.add(new_admission)
+            session.flush()
+            rollup.record_admission(session, new_admission.admissionid)
+            session.commit()
 
             print("\nQuick Admission Successful:")
             print("=" * 80)
@@ -52,22 +96,22 @@ def quick_admit_patient(patient_name, department_name, doctor_username, conditio
 
         except Exception as e:
             print(f"Error in quick admission: {str(e)}")
-            db.session.rollback()
+            session.rollback()
             return None
 
 def quick_discharge_patient(patient_name):
     """
     Quick action to discharge a patient by name.
     """
-    with app.app_context():
+    with session_scope() as session:
         try:
             # Find patient
-            patient = Patient.query.filter_by(patientname=patient_name).first()
+            patient = choose_patient(session, patient_name, admitted=True)
             if not patient:
-                raise ValueError(f"Patient '{patient_name}' not found")
+                raise ValueError(f"No admitted patient matching '{patient_name}' selected")
 
             # Find active admission
-            active_admission = Admission.query.filter_by(
+            active_admission = session.query(Admission).filter_by(
                 patient=patient.patientid,
                 dischargedate=None
             ).first()
@@ -77,7 +121,9 @@ def quick_discharge_patient(patient_name):
 
             # Update discharge date
             active_admission.dischargedate = datetime.utcnow()
-            db.session.commit()
+            session.flush()
+            rollup.record_discharge(session, active_admission.admissionid)
+            session.commit()
 
             print("\nQuick Discharge Successful:")
             print("=" * 80)
@@ -89,30 +135,30 @@ def quick_discharge_patient(patient_name):
 
         except Exception as e:
             print(f"Error in quick discharge: {str(e)}")
-            db.session.rollback()
+            session.rollback()
             return None
 
 def quick_check_patient_status(patient_name):
     """
     Quick action to check patient's current status.
     """
-    with app.app_context():
+    with session_scope() as session:
         try:
             # Find patient
-            patient = Patient.query.filter_by(patientname=patient_name).first()
+            patient = choose_patient(session, patient_name)
             if not patient:
-                raise ValueError(f"Patient '{patient_name}' not found")
+                raise ValueError(f"No patient matching '{patient_name}' selected")
 
             # Get active admission
-            active_admission = Admission.query.filter_by(
+            active_admission = session.query(Admission).filter_by(
                 patient=patient.patientid,
                 dischargedate=None
             ).first()
 
             if active_admission:
-                department = Department.query.get(active_admission.department)
-                doctor = Doctor.query.get(active_admission.administrator)
-                admission_type = AdmissionType.query.get(active_admission.admissiontype)
+                department = session.get(Department, active_admission.department)
+                doctor = session.get(Doctor, active_admission.administrator)
+                admission_type = session.get(AdmissionType, active_admission.admissiontype)
 
                 print("\nPatient Status:")
                 print("=" * 80)
@@ -125,7 +171,7 @@ def quick_check_patient_status(patient_name):
                 print(f"Admitted: {active_admission.admissiondate}")
                 print(f"Fee: ${active_admission.fee:,.2f}")
             else:
-                print(f"\nPatient '{patient_name}' is not currently admitted.")
+                print(f"\nPatient '{patient.patientname}' is not currently admitted.")
 
             print("=" * 80)
 
@@ -136,10 +182,10 @@ def quick_list_active_patients():
     """
     Quick action to list all currently admitted patients.
     """
-    with app.app_context():
+    with session_scope() as session:
         try:
             active_admissions = (
-                db.session.query(Admission, Patient, Department, Doctor)
+                session.query(Admission, Patient, Department, Doctor)
                 .join(Patient, Admission.patient == Patient.patientid)
                 .join(Department, Admission.department == Department.deptid)
                 .join(Doctor, Admission.administrator == Doctor.username)
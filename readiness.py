@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessProbe:
+    """Deferred dependency check for the readiness endpoint.
+
+    ``check`` is a callable that raises when a dependency is unavailable. It
+    is never run at import or app creation; it runs when readiness is asked
+    for (at most once per ``cache_seconds``) or from the background thread
+    started by ``start``, which retries with exponential backoff while the
+    dependency is down.
+    """
+
+    def __init__(self, check, cache_seconds=5):
+        self.check = check
+        self.cache_seconds = cache_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = False
+        self._error = None
+        self._checked_at = None
+        self._checked_monotonic = None
+
+    def run(self):
+        """Run the check now and record the outcome"""
+        try:
+            self.check()
+            ready, error = True, None
+        except Exception as e:
+            ready, error = False, str(e)
+        with self._lock:
+            if ready != self._ready:
+                if ready:
+                    logger.info("Readiness check passed")
+                else:
+                    logger.warning(f"Readiness check failed: {error}")
+            self._ready, self._error = ready, error
+            self._checked_at = datetime.utcnow()
+            self._checked_monotonic = time.monotonic()
+        return ready
+
+    def status(self):
+        with self._lock:
+            stale = (self._checked_monotonic is None or
+                     time.monotonic() - self._checked_monotonic >= self.cache_seconds)
+        if stale:
+            self.run()
+        with self._lock:
+            return {
+                'ready': self._ready,
+                'error': self._error,
+                'checked_at': self._checked_at.isoformat() if self._checked_at else None
+            }
+
+    def start(self, interval=30, max_backoff=60):
+        """Keep checking in a daemon thread: every ``interval`` seconds while
+        ready, backing off from 1s up to ``max_backoff`` while not."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, args=(interval, max_backoff),
+                                            name='readiness-probe', daemon=True)
+        self._thread.start()
+
+    def _loop(self, interval, max_backoff):
+        backoff = 1
+        while True:
+            if self.run():
+                backoff = 1
+                time.sleep(interval)
+            else:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
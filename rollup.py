@@ -0,0 +1,132 @@
+"""Daily admission rollup: one row per day x department x admission type.
+
+``daily_admission_rollup`` holds, per bucket, the admissions made that
+day and their fees (revenue is booked on the admission day, as everywhere
+else in the app), the discharges that day and the patient-days of those
+discharged stays (so ``patient_days / discharges`` is the average length of
+stay). Admissions without a department or admission type are kept under 0.
+
+The app updates the rollup in the same transaction as each admission and
+discharge; ingest_admissions.py does the same per batch. Anything that
+writes admissions another way (the add_*.py scripts, manual SQL) should be
+followed by a backfill, which recomputes a date range from the admission
+table:
+
+    python rollup.py --start 2024-01-01 --end 2025-01-01
+    python rollup.py            # everything
+"""
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+UPSERT = """
+    INSERT INTO daily_admission_rollup
+        (day, department, admission_type, admissions, revenue, discharges, patient_days)
+    {select}
+    ON CONFLICT (day, department, admission_type) DO UPDATE SET
+        admissions = daily_admission_rollup.admissions + EXCLUDED.admissions,
+        revenue = daily_admission_rollup.revenue + EXCLUDED.revenue,
+        discharges = daily_admission_rollup.discharges + EXCLUDED.discharges,
+        patient_days = daily_admission_rollup.patient_days + EXCLUDED.patient_days
+"""
+
+# Bucket expressions shared by the incremental updates and the backfill so
+# both agree on which day an admission belongs to
+ADMISSION_BUCKET = "a.admissiondate::date, coalesce(a.department, 0), coalesce(a.admissiontype, 0)"
+DISCHARGE_BUCKET = "a.dischargedate::date, coalesce(a.department, 0), coalesce(a.admissiontype, 0)"
+# Rounded per stay so incremental and rebuilt sums are identical
+STAY_DAYS = "round(extract(epoch from a.dischargedate - a.admissiondate) / 86400, 6)"
+
+ADMIT_SQL = UPSERT.format(select=f"""
+    SELECT {ADMISSION_BUCKET}, 1, coalesce(a.fee, 0), 0, 0
+    FROM admission a WHERE a.admissionid = :admission_id
+""")
+
+DISCHARGE_SQL = UPSERT.format(select=f"""
+    SELECT {DISCHARGE_BUCKET}, 0, 0, 1, {STAY_DAYS}
+    FROM admission a WHERE a.admissionid = :admission_id AND a.dischargedate IS NOT NULL
+""")
+
+REVENUE_SQL = UPSERT.format(select=f"""
+    SELECT {ADMISSION_BUCKET}, 0, :delta, 0, 0
+    FROM admission a WHERE a.admissionid = :admission_id
+""")
+
+
+def aggregate_sql(source, admitted='TRUE', discharged='TRUE'):
+    """SELECT of rollup rows for the admissions in ``source``: those
+    matching ``admitted`` count towards their admission day, those matching
+    ``discharged`` towards their discharge day"""
+    return f"""
+        SELECT day, department, admission_type, sum(admissions), sum(revenue), sum(discharges), sum(patient_days)
+        FROM (
+            SELECT {ADMISSION_BUCKET}, count(*), coalesce(sum(a.fee), 0), 0, 0
+            FROM {source} a WHERE {admitted}
+            GROUP BY 1, 2, 3
+            UNION ALL
+            SELECT {DISCHARGE_BUCKET}, 0, 0, count(*), sum({STAY_DAYS})
+            FROM {source} a WHERE a.dischargedate IS NOT NULL AND {discharged}
+            GROUP BY 1, 2, 3
+        ) t (day, department, admission_type, admissions, revenue, discharges, patient_days)
+        GROUP BY day, department, admission_type
+    """
+
+
+def batch_sql(table):
+    """Statement counting every admission in ``table`` (a staging table
+    with the admission columns); run it before committing the batch"""
+    return UPSERT.format(select=aggregate_sql(table))
+
+
+def record_admission(session, admission_id):
+    """Count a new admission; call before committing it"""
+    session.execute(text(ADMIT_SQL), {'admission_id': admission_id})
+
+
+def record_discharge(session, admission_id, fee_delta=0):
+    """Count a discharge, plus any fee change made at discharge on the
+    admission day's revenue; call before committing it"""
+    session.execute(text(DISCHARGE_SQL), {'admission_id': admission_id})
+    if fee_delta:
+        session.execute(text(REVENUE_SQL), {'admission_id': admission_id, 'delta': fee_delta})
+
+
+def backfill(connection, start=None, end=None):
+    """Recompute the rollup for days in ``[start, end)`` (dates or None for
+    unbounded) from the admission table; returns the number of rows written"""
+    bounds, params = [], {}
+    if start:
+        bounds.append("{column} >= :start")
+        params['start'] = start
+    if end:
+        bounds.append("{column} < :end")
+        params['end'] = end
+
+    def where(column):
+        return ' AND '.join(['TRUE'] + [bound.format(column=column) for bound in bounds])
+
+    connection.execute(text(f"DELETE FROM daily_admission_rollup WHERE {where('day')}"), params)
+    result = connection.execute(text(f"""
+        INSERT INTO daily_admission_rollup
+            (day, department, admission_type, admissions, revenue, discharges, patient_days)
+        {aggregate_sql('admission', where('a.admissiondate'), where('a.dischargedate'))}
+    """), params)
+    return result.rowcount
+
+
+if __name__ == '__main__':
+    from database import get_engine
+
+    parser = argparse.ArgumentParser(description='Rebuild daily_admission_rollup from the admission table')
+    parser.add_argument('--start', help='first day to rebuild, YYYY-MM-DD (default: the beginning)')
+    parser.add_argument('--end', help='day after the last one to rebuild, YYYY-MM-DD (default: no limit)')
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else None
+    end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else None
+    started = time.perf_counter()
+    with get_engine().begin() as conn:
+        rows = backfill(conn, start, end)
+    print(f"Rebuilt {rows:,} rollup rows in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,189 @@
+"""Ranked patient search by name and condition.
+
+Every patient row carries ``search_document``, a stored tsvector of the
+name (weight A) and condition (weight B) with a GIN index, and
+``patient_search_word`` holds each distinct word of those documents with
+the number of patients using it. A search runs in stages:
+
+1. name prefix: ``lower(patientname) LIKE 'q%'`` walks a C-collation btree
+   in name order, so the cost does not depend on how common the name is.
+   Exact names rank first, then the other prefix matches.
+2. only if that did not fill ``limit``: every query word is expanded to
+   the vocabulary words it is a prefix of (most used first) or, when there
+   are none, to those closest by trigram similarity (typos), and patients
+   whose document contains an expansion of each word are ranked by ts_rank
+   and name similarity. Only the ``CANDIDATES`` most recently registered
+   matches are ranked, so a very common word costs a short walk of the
+   primary key rather than scoring every patient that uses it, and the
+   same query always ranks the same candidates.
+
+Expanding against the vocabulary keeps the document query to exact
+lexemes, which the planner estimates from column statistics; prefix
+tsqueries get a fixed guess and can end up as a sequential scan of the
+whole table when nothing matches.
+
+The app keeps the vocabulary current as patients are added, renamed and
+deleted (``count_words``); ``rebuild_words`` recomputes it and is what to
+run after loading patients any other way:
+
+    python search.py --rebuild
+"""
+import argparse
+import re
+import time
+
+from sqlalchemy import text
+
+DOCUMENT = ("setweight(to_tsvector('simple', coalesce(patientname, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(condition, '')), 'B')")
+
+# Vocabulary words tried per query word, and document matches ranked per search
+EXPANSIONS = 12
+FUZZY_EXPANSIONS = 4
+CANDIDATES = 200
+
+ACTIVE_ADMISSION = """
+    LEFT JOIN LATERAL (
+        SELECT admissionid FROM admission
+        WHERE patient = p.patientid AND dischargedate IS NULL
+        ORDER BY admissionid DESC LIMIT 1
+    ) a ON TRUE
+"""
+
+NAME_PREFIX_SQL = """
+    SELECT p.patientid, p.patientname, p.condition, a.admissionid AS admission_id,
+           CASE WHEN lower(p.patientname) = :q THEN 3.0 ELSE 2.0 END AS score
+    FROM patient p {admission}
+    WHERE lower(p.patientname) COLLATE "C" LIKE :prefix {status}
+    ORDER BY lower(p.patientname) COLLATE "C", p.patientid
+    LIMIT :limit
+"""
+
+EXPAND_SQL = """
+    SELECT t.n, e.word
+    FROM unnest(CAST(:terms AS text[]), CAST(:patterns AS text[])) WITH ORDINALITY AS t(term, pattern, n)
+    CROSS JOIN LATERAL (
+        (SELECT word FROM patient_search_word
+         WHERE word LIKE t.pattern AND patients > 0
+         ORDER BY patients DESC LIMIT :expansions)
+        UNION
+        (SELECT word FROM patient_search_word
+         WHERE word % t.term AND patients > 0
+           AND NOT EXISTS (SELECT 1 FROM patient_search_word
+                           WHERE word LIKE t.pattern AND patients > 0)
+         ORDER BY word <-> t.term LIMIT :fuzzy)
+    ) e
+"""
+
+DOCUMENT_SQL = """
+    SELECT * FROM (
+        SELECT p.patientid, p.patientname, p.condition, a.admissionid AS admission_id,
+               (ts_rank(p.search_document, CAST(:tsquery AS tsquery))
+                + similarity(:q, lower(p.patientname))) / 2 AS score
+        FROM patient p {admission}
+        WHERE p.search_document @@ CAST(:tsquery AS tsquery)
+          AND p.patientid <> ALL(CAST(:found AS integer[])) {status}
+        ORDER BY p.patientid DESC
+        LIMIT :candidates
+    ) matches
+    ORDER BY score DESC, patientname, patientid
+    LIMIT :limit
+"""
+
+WORD_COUNTS_SQL = """
+    INSERT INTO patient_search_word (word, patients)
+    SELECT w.lexeme, {sign} * count(*) FROM {source} p, unnest(p.search_document) w
+    GROUP BY w.lexeme
+    ON CONFLICT (word) DO UPDATE SET patients = patient_search_word.patients + EXCLUDED.patients
+"""
+
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def tsquery_literal(groups):
+    """``('a' | 'b') & ('c')`` from lists of lexemes"""
+    def quote(word):
+        return "'" + word.replace('\\', '\\\\').replace("'", "''") + "'"
+    return ' & '.join('(' + ' | '.join(quote(word) for word in group) + ')' for group in groups)
+
+
+def search_patients(session, query, limit=10, admitted=None):
+    """Best matches for ``query`` as rows of ``(patientid, patientname,
+    condition, admission_id, score)``, best first; ``admission_id`` is the
+    patient's active admission, if any. ``admitted`` restricts the results
+    to patients who are (True) or are not (False) currently admitted.
+    """
+    query = ' '.join(query.lower().split())
+    if not query:
+        return []
+    status = '' if admitted is None else f"AND a.admissionid IS {'NOT ' if admitted else ''}NULL"
+
+    rows = session.execute(text(NAME_PREFIX_SQL.format(admission=ACTIVE_ADMISSION, status=status)), {
+        'q': query, 'prefix': escape_like(query) + '%', 'limit': limit}).all()
+    # Single letters (initials, the tail of a hyphenated word) match most
+    # documents and only make the document query slower
+    terms = re.findall(r'\w+', query)
+    terms = [term for term in terms if len(term) > 1] or terms
+    if len(rows) >= limit or not terms:
+        return rows
+
+    expansions = [set() for _ in terms]
+    for n, word in session.execute(text(EXPAND_SQL), {
+            'terms': terms, 'patterns': [escape_like(term) + '%' for term in terms],
+            'expansions': EXPANSIONS, 'fuzzy': FUZZY_EXPANSIONS}):
+        expansions[n - 1].add(word)
+    if not all(expansions):
+        return rows
+
+    rows += session.execute(text(DOCUMENT_SQL.format(admission=ACTIVE_ADMISSION, status=status)), {
+        'q': query, 'tsquery': tsquery_literal(sorted(group) for group in expansions),
+        'found': [row.patientid for row in rows], 'candidates': CANDIDATES,
+        'limit': limit - len(rows)}).all()
+    return rows
+
+
+def count_words(session, patient_id, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) the words of a patient's
+    stored document to the vocabulary; remove before changing or deleting
+    the patient, add after inserting or changing it (flush first)"""
+    source = '(SELECT search_document FROM patient WHERE patientid = :patient_id)'
+    session.execute(text(WORD_COUNTS_SQL.format(sign=int(sign), source=source)), {'patient_id': patient_id})
+
+
+def words_sql(source):
+    """Statement adding the words of every patient in ``source`` (a table
+    or subquery with a ``search_document`` column)"""
+    return WORD_COUNTS_SQL.format(sign=1, source=source)
+
+
+def rebuild_words(connection):
+    """Recompute patient_search_word from the patient table; returns the
+    number of words"""
+    connection.execute(text("DELETE FROM patient_search_word"))
+    return connection.execute(text("""
+        INSERT INTO patient_search_word (word, patients)
+        SELECT word, ndoc FROM ts_stat('SELECT search_document FROM patient')
+    """)).rowcount
+
+
+if __name__ == '__main__':
+    from database import get_engine, session_scope
+
+    parser = argparse.ArgumentParser(description='Search patients, or rebuild the search vocabulary')
+    parser.add_argument('query', nargs='?')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--rebuild', action='store_true', help='recompute patient_search_word')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        started = time.perf_counter()
+        with get_engine().begin() as conn:
+            words = rebuild_words(conn)
+        print(f"Rebuilt {words:,} search words in {time.perf_counter() - started:.1f}s")
+    if args.query:
+        with session_scope() as session:
+            for row in search_patients(session, args.query, args.limit):
+                status = f"admission {row.admission_id}" if row.admission_id else "not admitted"
+                print(f"{row.score:5.2f}  {row.patientid:>8}  {row.patientname:<30} {row.condition or '':<30} {status}")
@@ -0,0 +1,81 @@
+"""Fixtures for the database tests.
+
+The tests run against the PostgreSQL database named by ``TEST_DATABASE_URL``
+and are skipped when it is unset or unreachable. They migrate it to the
+latest revision and replace its contents with generated data, so never point
+it at a database you want to keep.
+"""
+import os
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    if not TEST_DATABASE_URL:
+        pytest.skip('TEST_DATABASE_URL is not set')
+    engine = create_engine(TEST_DATABASE_URL)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f'Cannot connect to TEST_DATABASE_URL: {e}')
+    finally:
+        engine.dispose()
+    # config.Config, the app and migrations/env.py all read DATABASE_URL
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option('script_location', os.path.join(ROOT, 'migrations'))
+    command.upgrade(alembic_config, 'head')
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture(scope='session')
+def hospital(database_url):
+    """The app module, imported once DATABASE_URL points at the test database"""
+    import app as hospital
+    hospital.app.config['TESTING'] = True
+    return hospital
+
+
+@pytest.fixture
+def login(hospital):
+    """``login()`` returns a test client logged in as the admin that
+    generate_data creates, so call it after ``generate``"""
+    def login():
+        client = hospital.app.test_client()
+        response = client.post('/login', data={'loginid': 'admin', 'passid': 'admin123'})
+        assert response.status_code == 302
+        return client
+
+    return login
+
+
+@pytest.fixture(scope='session')
+def generate(hospital):
+    """``generate(**options)`` empties the test database, fills it with
+    generate_data.HospitalGenerator up to today and returns its counts"""
+    from generate_data import HospitalGenerator
+
+    def generate(seed=1, departments=12, doctors=60, patients=20000, years=3, admissions_per_day=60,
+                 vitals=False):
+        end = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        generator = HospitalGenerator(seed, departments, doctors, patients, years, admissions_per_day, end,
+                                      vitals=vitals)
+        with hospital.app.app_context():
+            counts = generator.run(hospital.db.engine, reset=True)
+        # The in-process copies describe the data that was just replaced
+        hospital.stats_cache.backend.clear()
+        hospital.occupancy_index.invalidate()
+        return counts
+
+    return generate
+
@@ -0,0 +1,108 @@
+import pytest
+
+import cache
+from cache import MemoryBackend, RedisBackend, ResponseCache, create_backend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'fakeredis'])
+def backend(request):
+    if request.param == 'memory':
+        return create_backend('memory')
+    pytest.importorskip('fakeredis')
+    return create_backend('redis', url='fakeredis://')
+
+
+def test_backend_round_trip(backend):
+    backend.set('stats:beds', b'{"total": 5}', ttl=30)
+    assert backend.get('stats:beds') == b'{"total": 5}'
+    assert backend.get('stats:revenue') is None
+
+
+def test_backend_delete_and_clear(backend):
+    for key in ('a', 'b', 'c'):
+        backend.set(key, key.encode(), ttl=30)
+    backend.delete('a', 'b')
+    assert [backend.get(key) for key in ('a', 'b', 'c')] == [None, None, b'c']
+    backend.delete()
+    backend.clear()
+    assert backend.get('c') is None
+
+
+def test_redis_backend_keeps_its_keys_under_the_prefix():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    client.set('other:key', b'kept')
+    backend = RedisBackend(client, prefix='test:')
+    backend.set('stats:beds', b'1', ttl=0.2)
+    assert client.get('test:stats:beds') == b'1'
+    assert 0 < client.ttl('test:stats:beds') <= 1
+    backend.clear()
+    assert client.keys() == [b'other:key']
+
+
+def test_memory_backend_expires_entries(clock):
+    backend = MemoryBackend()
+    backend.set('key', b'value', ttl=30)
+    clock.now += 29
+    assert backend.get('key') == b'value'
+    clock.now += 1
+    assert backend.get('key') is None
+
+
+def test_memory_backend_evicts_least_recently_used(clock):
+    backend = MemoryBackend(max_entries=2)
+    backend.set('a', b'a', ttl=30)
+    backend.set('b', b'b', ttl=30)
+    backend.get('a')
+    backend.set('c', b'c', ttl=30)
+    assert [backend.get(key) for key in ('a', 'b', 'c')] == [b'a', None, b'c']
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match='Unknown cache backend'):
+        create_backend('memcached')
+
+
+def test_response_cache_counts_hits_misses_and_invalidations():
+    responses = ResponseCache(MemoryBackend())
+    assert responses.get('stats:beds') is None
+    responses.set('stats:beds', b'1', ttl=30)
+    assert responses.get('stats:beds') == b'1'
+    assert responses.get('stats:beds') == b'1'
+    responses.invalidate('stats:beds')
+    stats = responses.stats()
+    assert stats['backend'] == 'memory'
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 1, 0.667)
+    assert stats['keys']['stats:beds'] == {'hits': 2, 'misses': 1, 'invalidations': 1, 'hit_rate': 0.667}
+
+
+class BrokenBackend:
+    name = 'broken'
+
+    def get(self, *args):
+        raise ConnectionError('cache server unreachable')
+
+    set = delete = get
+
+
+def test_response_cache_treats_backend_errors_as_misses():
+    responses = ResponseCache(BrokenBackend())
+    responses.set('stats:beds', b'1', ttl=30)
+    assert responses.get('stats:beds') is None
+    responses.invalidate('stats:beds')
+    assert responses.stats()['misses'] == 1
@@ -0,0 +1,20 @@
+"""/api/dashboard/stats sends the same number of statements however many
+departments the hospital has."""
+
+DEPARTMENTS = 40
+
+
+def dashboard_stats_statements(hospital, client, departments):
+    response = client.get('/api/dashboard/stats')
+    assert response.status_code == 200
+    assert len(response.get_json()['department_occupancy']) == departments
+    return hospital.sql_instrumentation.last().count
+
+
+def test_dashboard_stats_query_count_is_bounded(hospital, generate, login):
+    counts = {}
+    for departments in (1, DEPARTMENTS):
+        generate(departments=departments, doctors=2 * departments, patients=500, years=0.1,
+                 admissions_per_day=40)
+        counts[departments] = dashboard_stats_statements(hospital, login(), departments)
+    assert counts[1] == counts[DEPARTMENTS], counts
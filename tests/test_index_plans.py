@@ -0,0 +1,98 @@
+"""The admission hot paths are answered from the indexes in migration 0002.
+
+Each endpoint is requested against a generated hospital of
+``TEST_ADMISSIONS`` admissions (1M by default; seeding takes a few minutes).
+Every statement it sends that reads ``admission`` is EXPLAINed exactly as
+sent, so the plans follow the endpoints' own queries, and none of them may
+scan the table sequentially.
+"""
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+ADMISSIONS = int(os.getenv('TEST_ADMISSIONS', '1000000'))
+YEARS = 3
+
+ENDPOINTS = {
+    'active admissions by department': '/api/admissions?status=active&department={department}',
+    'active admissions by doctor': '/api/admissions?status=active&doctor={doctor}',
+    'admissions on a date': '/api/admissions?date={date}',
+    'admissions page (keyset)': '/api/admissions?cursor={cursor}',
+    'patient details': '/patients/{patient}',
+    'patient admission history': '/api/patients/{patient}/admissions',
+    'doctor details': '/doctors/{doctor}',
+    'doctor admission history': '/api/doctors/{doctor}/admissions',
+    'active doctor count': '/api/statistics/doctors/count',
+    'admissions this week': '/api/recent-admissions?filter=week',
+}
+
+ADMISSION_TABLE = re.compile(r'\badmission\b')
+
+
+@contextmanager
+def captured_statements(engine):
+    """Collect the ``(statement, parameters)`` sent through ``engine``"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+
+def admission_scans(plan):
+    """Yield ``(node_type, index_name)`` for every scan of admission"""
+    if plan.get('Relation Name') == 'admission' and 'Scan' in plan['Node Type']:
+        index = plan.get('Index Name')
+        if index is None and plan['Node Type'] == 'Bitmap Heap Scan':
+            index = ', '.join(child.get('Index Name', '') for child in plan.get('Plans', []))
+        yield plan['Node Type'], index
+    for child in plan.get('Plans', []):
+        yield from admission_scans(child)
+
+
+@pytest.fixture(scope='module')
+def hot_path_values(hospital, generate):
+    generate(patients=max(1000, ADMISSIONS // 5), years=YEARS, admissions_per_day=ADMISSIONS / (YEARS * 365))
+    Admission = hospital.Admission
+    with hospital.app.app_context():
+        active = (Admission.query
+            .filter(Admission.dischargedate == None)
+            .order_by(Admission.admissionid)
+            .first())
+        return {
+            'department': active.department,
+            'doctor': active.administrator,
+            'patient': active.patient,
+            'date': (datetime.utcnow().date() - timedelta(days=30)).isoformat(),
+            'cursor': hospital.encode_cursor(active.admissiondate.isoformat(), active.admissionid)
+        }
+
+
+@pytest.mark.parametrize('name', ENDPOINTS)
+def test_endpoint_uses_admission_indexes(name, hospital, hot_path_values, login):
+    path = ENDPOINTS[name].format(**hot_path_values)
+    hospital.stats_cache.backend.clear()
+    with hospital.app.app_context():
+        engine = hospital.db.engine
+    with captured_statements(engine) as statements:
+        response = login().get(path)
+    assert response.status_code == 200, path
+
+    admission_statements = [(sql, params) for sql, params in statements if ADMISSION_TABLE.search(sql)]
+    assert admission_statements, f'{path} did not read admission'
+    with engine.connect() as conn:
+        for sql, params in admission_statements:
+            result = conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', params).scalar()
+            scans = list(admission_scans(result[0]['Plan']))
+            assert scans, sql
+            assert all(node_type != 'Seq Scan' for node_type, _ in scans), f'{path}: {scans}\n{sql}'
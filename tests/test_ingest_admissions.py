@@ -0,0 +1,72 @@
+import pytest
+
+from ingest_admissions import ReferenceSets, normalize, read_records, validate
+
+
+@pytest.fixture
+def refs():
+    return ReferenceSets(patients={1, 2, 3}, departments={10}, admission_types={4}, doctors={'dr.smith'},
+                         active_patients={2})
+
+
+def admission(**fields):
+    return {'patient_id': '1', 'department_id': '10', 'admission_type_id': '4',
+            'doctor_username': 'dr.smith', 'admission_date': '2024-03-01T08:00:00', **fields}
+
+
+def test_normalize_maps_api_names_and_blanks():
+    assert normalize({' Patient_ID ': ' 7 ', 'condition': '', None: ['extra']}) == {
+        'patient': '7', 'condition': None}
+
+
+def test_valid_record_becomes_a_copy_row(refs):
+    row = validate(admission(discharge_date='2024-03-03T10:00:00', fee='1500.5', condition='Flu'), refs)
+    assert row == (4, 10, 1, 'dr.smith', 'Flu', '2024-03-01 08:00:00', '2024-03-03 10:00:00', '1500.50')
+
+
+def test_active_admission_reserves_the_patient(refs):
+    validate(admission(patient_id='3'), refs)
+    with pytest.raises(ValueError, match='already has an active admission'):
+        validate(admission(patient_id='3'), refs)
+
+
+@pytest.mark.parametrize('fields, error', [
+    ({'patient_id': None}, 'Missing required fields: patient'),
+    ({'patient_id': 'one'}, 'patient must be an integer'),
+    ({'patient_id': 1e400}, 'patient must be an integer'),
+    ({'patient_id': '9'}, 'Patient with ID 9 not found'),
+    ({'department_id': '11'}, 'Department with ID 11 not found'),
+    ({'doctor_username': 'dr.nobody'}, 'dr.nobody not found'),
+    ({'admission_date': 'yesterday'}, 'ISO 8601'),
+    ({'discharge_date': '2024-02-01T08:00:00'}, 'before admissiondate'),
+    ({'discharge_date': '2024-03-02T08:00:00Z'}, 'UTC offset'),
+    ({'patient_id': '2'}, 'already has an active admission'),
+    ({'fee': 'free'}, 'fee must be a number'),
+    ({'fee': '-1'}, 'fee out of range'),
+    ({'fee': 'NaN'}, 'fee out of range'),
+])
+def test_invalid_record_is_rejected(refs, fields, error):
+    with pytest.raises(ValueError, match=error):
+        validate(admission(**fields), refs)
+
+
+def test_ndjson_lines_that_are_not_objects_are_rejected(tmp_path, refs):
+    path = tmp_path / 'admissions.ndjson'
+    path.write_text('\n'.join([
+        '{"patient": 1, "department": 10, "admissiontype": 4, "administrator": "dr.smith", '
+        '"admissiondate": "2024-03-01T08:00:00", "fee": 10}',
+        '[1, 2]', '', '42', '"text"', 'null', '{not json',
+    ]) + '\n', encoding='utf-8')
+
+    records = list(read_records(str(path), 'ndjson'))
+    assert [number for number, _ in records] == [1, 2, 3, 4, 5, 6]
+    assert validate(records[0][1], refs)[-1] == '10.00'
+    assert records[1][1] == {'_error': 'Invalid JSON: record 2 is a JSON list, not an object', '_line': '[1, 2]'}
+    for _, record in records[1:]:
+        with pytest.raises(ValueError, match='Invalid JSON'):
+            validate(record, refs)
+
+
+def test_validate_rejects_records_that_are_not_objects(refs):
+    with pytest.raises(ValueError, match='JSON object'):
+        validate(['not', 'an', 'object'], refs)
@@ -0,0 +1,50 @@
+import math
+
+from metrics import Counter, Histogram, escape_label, format_metric, format_value, histogram_samples
+
+
+def test_format_value():
+    assert [format_value(value) for value in (3, 2.0, 0.25, math.inf, 1e20)] == ['3', '2', '0.25', '+Inf', '1e+20']
+
+
+def test_label_values_are_escaped():
+    assert escape_label('a "b"\\c\nd') == 'a \\"b\\"\\\\c\\nd'
+
+
+def test_format_metric():
+    assert format_metric('hms_beds', 'gauge', 'Beds.', [('', {}, 5), ('_free', {'ward': 'ICU'}, 2.0)]) == (
+        '# HELP hms_beds Beds.\n'
+        '# TYPE hms_beds gauge\n'
+        'hms_beds 5\n'
+        'hms_beds_free{ward="ICU"} 2\n'
+    )
+
+
+def test_counter_renders_one_sample_per_label_set():
+    counter = Counter('hms_requests_total', 'Requests.', ['method', 'status'])
+    counter.inc(method='GET', status=200)
+    counter.inc(2, method='GET', status=200)
+    counter.inc(method='POST', status=302)
+    assert counter.render().splitlines()[2:] == [
+        'hms_requests_total{method="GET",status="200"} 3',
+        'hms_requests_total{method="POST",status="302"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('hms_latency_seconds', 'Latency.', ['endpoint'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, endpoint='index')
+    assert histogram.render().splitlines()[2:] == [
+        'hms_latency_seconds_bucket{endpoint="index",le="0.1"} 1',
+        'hms_latency_seconds_bucket{endpoint="index",le="1"} 3',
+        'hms_latency_seconds_bucket{endpoint="index",le="+Inf"} 4',
+        'hms_latency_seconds_sum{endpoint="index"} 4.25',
+        'hms_latency_seconds_count{endpoint="index"} 4',
+    ]
+
+
+def test_histogram_samples_from_cumulative_counts():
+    samples = histogram_samples({'q': 'x'}, [(1, 2), (5, 3)], count=4, total=9.5)
+    assert [(suffix, labels.get('le'), value) for suffix, labels, value in samples] == [
+        ('_bucket', '1', 2), ('_bucket', '5', 3), ('_bucket', '+Inf', 4), ('_sum', None, 9.5), ('_count', None, 4)]
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import MAX_PAGE_SIZE, decode_admission_cursor, decode_cursor, encode_cursor, parse_page_limit
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2024-03-01T08:00:00', 42, 'Dr. O\'Neil')
+    assert decode_cursor(cursor) == ['2024-03-01T08:00:00', 42, "Dr. O'Neil"]
+    assert set(cursor) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=')
+
+
+def test_admission_cursor_round_trip():
+    cursor = encode_cursor('2024-03-01T08:00:00+00:00', 42)
+    assert decode_admission_cursor(cursor) == (datetime.fromisoformat('2024-03-01T08:00:00+00:00'), 42)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor!', 'abc', '\u00e9', encode_cursor('yesterday', 1)[:-4]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize('cursor', [encode_cursor('yesterday', 1), encode_cursor('2024-03-01', 'x'),
+                                    encode_cursor('2024-03-01'), encode_cursor(None, 1)])
+def test_malformed_admission_cursor_is_rejected(cursor):
+    with pytest.raises((ValueError, TypeError)):
+        decode_admission_cursor(cursor)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, 50), ('', 50), ('20', 20), ('ten', 50), ('0', 1), ('-5', 1), (str(MAX_PAGE_SIZE + 1), MAX_PAGE_SIZE),
+])
+def test_page_limit_is_clamped(value, expected):
+    assert parse_page_limit(value, 50) == expected
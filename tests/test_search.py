@@ -0,0 +1,17 @@
+from search import escape_like, tsquery_literal
+
+
+def test_tsquery_literal_ors_within_and_ands_across_groups():
+    assert tsquery_literal([['jon', 'john'], ['smith']]) == "('jon' | 'john') & ('smith')"
+
+
+def test_tsquery_literal_quotes_lexemes():
+    assert tsquery_literal([["o'neil", 'back\\slash']]) == "('o''neil' | 'back\\\\slash')"
+
+
+def test_tsquery_literal_accepts_generators():
+    assert tsquery_literal(sorted(group) for group in [{'b', 'a'}]) == "('a' | 'b')"
+
+
+def test_escape_like():
+    assert escape_like('50%_a\\b') == '50\\%\\_a\\\\b'
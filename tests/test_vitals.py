@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+import vitals
+
+ADMITTED = datetime.now(timezone.utc) - timedelta(days=2)
+ADMISSIONS = {7: (ADMITTED, None)}
+
+
+def reading(**fields):
+    return {'admission_id': 7, 'timestamp': (ADMITTED + timedelta(hours=1)).isoformat(), **fields}
+
+
+class NoRowsSession:
+    """Answers every query with no rows"""
+
+    def execute(self, statement, params=None):
+        return []
+
+
+def test_valid_reading_becomes_a_copy_row():
+    row = vitals.validate_reading(reading(temperature=37.24, blood_pressure=' 120 / 80 ', pulse=72),
+                                  ADMISSIONS, {'dr.smith'}, 'dr.smith')
+    assert row[0] == 7
+    assert row[2:5] == (Decimal('37.2'), '120/80', 72)
+    assert row[6] == 'dr.smith'
+
+
+def test_naive_admission_dates_are_utc():
+    admissions = {7: (ADMITTED.replace(tzinfo=None), None)}
+    assert vitals.validate_reading(reading(pulse_rate=80), admissions, set(), None)[0] == 7
+
+
+@pytest.mark.parametrize('record, error', [
+    ([1, 2], 'JSON object'),
+    (reading(admission_id='x', pulse_rate=80), 'admission_id must be an integer'),
+    (reading(admission_id=8, pulse_rate=80), 'not found'),
+    (reading(pulse_rate=80, timestamp=(ADMITTED - timedelta(hours=1)).isoformat()), 'outside admission'),
+    (reading(pulse_rate=400), 'pulse_rate out of range'),
+    (reading(temperature='warm'), 'temperature must be a number'),
+    (reading(blood_pressure='high'), 'Blood pressure must look like'),
+    (reading(), 'no temperature'),
+    (reading(pulse_rate=80, recorded_by='dr.nobody'), 'dr.nobody'),
+])
+def test_invalid_reading_is_rejected(record, error):
+    with pytest.raises(ValueError, match=error):
+        vitals.validate_reading(record, ADMISSIONS, {'dr.smith'}, None)
+
+
+@pytest.mark.parametrize('field', ['pulse_rate', 'temperature', 'admission_id'])
+def test_overflowing_number_is_rejected(field):
+    record = {**reading(pulse_rate=80), **json.loads(f'{{"{field}": 1e400}}')}
+    with pytest.raises(ValueError):
+        vitals.validate_reading(record, ADMISSIONS, set(), None)
+
+
+def test_ingest_reports_overflowing_readings_by_index():
+    records = [json.loads('{"admission_id": 1e400, "pulse_rate": 80}'), json.loads('{"pulse_rate": 1e400}')]
+    inserted, errors = vitals.ingest(NoRowsSession(), records)
+    assert inserted == 0
+    assert [error['index'] for error in errors] == [0, 1]
@@ -0,0 +1,322 @@
+"""Vitals time series (the admissiondetails table).
+
+Each reading keeps the blood pressure as entered (``blood_pressure``,
+e.g. ``120/80``) plus ``systolic`` and ``diastolic`` columns that
+PostgreSQL generates from it, so they can be aggregated without parsing
+text per row; a reading that does not look like ``S/D`` gets NULLs there.
+Readings are indexed on ``(admissionid, timestamp, detailid)``, so a time
+window of one admission is a single index range scan.
+
+Two kinds of query over a window ``[start, end)``:
+
+* ``readings``: the raw readings in time order, a page at a time, with
+  keyset pagination on ``(timestamp, detailid)``
+* ``buckets``: min/max/avg of each vital per fixed-width bucket (aligned
+  to whole multiples of the width since the Unix epoch, UTC), for charts
+  over stays too long to send reading by reading. A page of N buckets
+  only reads the rows of those N buckets. Uses ``date_bin``, so needs
+  PostgreSQL 14 or newer.
+
+``ingest`` writes a batch of readings across many admissions, as sent by
+bedside monitors: the admissions (and recorders) are checked with one
+query each, the valid readings go in with a single COPY in the caller's
+transaction and each invalid one is reported by its position in the batch.
+
+    python vitals.py 1234 --bucket 1h
+"""
+import argparse
+import json
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import text
+
+from ingest_admissions import copy_rows
+
+SYSTOLIC = r"CAST(substring(blood_pressure FROM '^\s*(\d{2,3})\s*/\s*\d{2,3}\s*$') AS smallint)"
+DIASTOLIC = r"CAST(substring(blood_pressure FROM '^\s*\d{2,3}\s*/\s*(\d{2,3})\s*$') AS smallint)"
+BLOOD_PRESSURE = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*$')
+
+VITALS = ['temperature', 'systolic', 'diastolic', 'pulse_rate']
+
+# Bucket widths picked when a chart asks for a number of points rather than a width
+BUCKET_STEPS = [60, 300, 600, 900, 1800, 3600, 2 * 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 7 * 86400]
+BUCKET_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+INGEST_COLUMNS = ['admissionid', 'timestamp', 'temperature', 'blood_pressure', 'pulse_rate', 'notes',
+                  'recorded_by']
+
+FIELD_ALIASES = {
+    'admission_id': 'admissionid',
+    'recorded_at': 'timestamp',
+    'pulse': 'pulse_rate',
+}
+
+# Plausible readings; anything outside is a device or mapping error
+TEMPERATURE_RANGE = (Decimal('25.0'), Decimal('45.0'))
+PULSE_RANGE = (0, 300)
+# How far ahead of the server clock a device's timestamp may be
+CLOCK_SKEW = timedelta(minutes=5)
+
+READINGS_SQL = """
+    SELECT d.detailid, d.timestamp, d.temperature, d.blood_pressure, d.systolic, d.diastolic,
+           d.pulse_rate, d.notes, d.recorded_by, doc.doctorname
+    FROM admissiondetails d
+    LEFT JOIN doctordetails doc ON doc.username = d.recorded_by
+    WHERE d.admissionid = :admission_id {window}
+    ORDER BY d.timestamp {direction}, d.detailid {direction}
+    LIMIT :limit
+"""
+
+BUCKETS_SQL = """
+    SELECT date_bin(make_interval(secs => :width), timestamp, TIMESTAMPTZ 'epoch') AS start,
+           count(*) AS readings, {aggregates}
+    FROM admissiondetails
+    WHERE admissionid = :admission_id AND timestamp >= :start AND timestamp < :end
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+
+def parse_blood_pressure(value):
+    """``(systolic, diastolic)`` from a reading like ``120/80``; raises
+    ValueError for anything else"""
+    match = BLOOD_PRESSURE.match(str(value))
+    if not match:
+        raise ValueError(f"Blood pressure must look like 120/80, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def as_utc(moment):
+    """``moment`` as an aware UTC datetime; naive values (as the
+    ``TIMESTAMP`` columns of database.txt return them) are taken as UTC"""
+    if moment is None:
+        return None
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def parse_time(value):
+    """ISO 8601 timestamp as an aware UTC datetime; naive values are taken as UTC"""
+    return as_utc(datetime.fromisoformat(value))
+
+
+def window(admitted, discharged, start=None, end=None):
+    """``(start, end)`` in aware UTC for a window over an admission:
+    ``start``/``end`` are ISO strings and default to the admission date
+    and the discharge date (or now)"""
+    start = parse_time(start) if start else as_utc(admitted)
+    end = parse_time(end) if end else as_utc(discharged) or datetime.now(timezone.utc)
+    return start, end
+
+
+def parse_bucket(value):
+    """Bucket width in seconds from ``90``, ``5m``, ``1h`` or ``1d``"""
+    match = re.fullmatch(r'\s*(\d+)\s*([smhd]?)\s*', str(value))
+    if not match or not int(match.group(1)):
+        raise ValueError(f"Bucket must be a positive number of seconds or like 5m, 1h, 1d, got {value!r}")
+    return int(match.group(1)) * BUCKET_UNITS.get(match.group(2) or 's')
+
+
+def bucket_for(start, end, points):
+    """Smallest step in ``BUCKET_STEPS`` that covers ``[start, end)`` in at
+    most ``points`` buckets (or whole weeks beyond the largest step)"""
+    needed = (end - start).total_seconds() / max(points, 1)
+    for step in BUCKET_STEPS:
+        if step >= needed:
+            return step
+    return BUCKET_STEPS[-1] * math.ceil(needed / BUCKET_STEPS[-1])
+
+
+def bucket_floor(moment, width):
+    """Start of the bucket ``moment`` falls in"""
+    return datetime.fromtimestamp(math.floor(moment.timestamp() / width) * width, timezone.utc)
+
+
+def readings(session, admission_id, start=None, end=None, limit=200, after=None, newest_first=False):
+    """Up to ``limit`` readings of an admission in ``[start, end)`` (either
+    bound optional) in time order, oldest first unless ``newest_first``.
+    ``after`` is the ``(timestamp, detailid)`` of the last reading of the
+    previous page. Rows carry the recorder's ``doctorname``."""
+    window, params = [], {'admission_id': admission_id, 'limit': limit}
+    if start is not None:
+        window.append("d.timestamp >= :start")
+        params['start'] = start
+    if end is not None:
+        window.append("d.timestamp < :end")
+        params['end'] = end
+    if after is not None:
+        window.append(f"(d.timestamp, d.detailid) {'<' if newest_first else '>'} (:after_time, :after_id)")
+        params['after_time'], params['after_id'] = after
+    sql = READINGS_SQL.format(window=''.join(' AND ' + condition for condition in window),
+                              direction='DESC' if newest_first else 'ASC')
+    return session.execute(text(sql), params).all()
+
+
+def buckets(session, admission_id, start, end, width, limit=500):
+    """Per-bucket reading count and min/max/avg of each vital for up to
+    ``limit`` buckets of ``width`` seconds from the one containing ``start``
+    up to ``end``. Buckets without readings are left out. Returns
+    ``(rows, next_start)``; ``next_start`` is where the following page
+    begins, or None when this page reaches ``end``."""
+    start, end = as_utc(start), as_utc(end)
+    first = bucket_floor(start, width)
+    page_end = first + timedelta(seconds=width * limit)
+    next_start = page_end if page_end < end else None
+    aggregates = ', '.join(f"min({vital}) AS {vital}_min, max({vital}) AS {vital}_max, "
+                           f"avg({vital}) AS {vital}_avg" for vital in VITALS)
+    rows = session.execute(text(BUCKETS_SQL.format(aggregates=aggregates)), {
+        'admission_id': admission_id, 'width': width,
+        'start': max(start, first), 'end': min(end, page_end)}).all()
+    return rows, next_start
+
+
+def read_batch(body, ndjson=False):
+    """The readings of a request body: a JSON array, an object with a
+    ``readings`` array, or NDJSON (one reading per line). Lines of NDJSON
+    that do not parse are returned as ``{'_error': ...}`` so they can be
+    reported with the rest; a JSON body that does not parse raises
+    ValueError."""
+    if ndjson:
+        records = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append({'_error': f'Invalid JSON: {e}'})
+        return records
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = data.get('readings')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of readings or {"readings": [...]}')
+    return data
+
+
+def validate_reading(record, admissions, doctors, recorded_by):
+    """Return the COPY row for ``record`` or raise ValueError.
+    ``admissions`` maps admission IDs to ``(admissiondate, dischargedate)``;
+    ``recorded_by`` is used when the reading does not name its recorder."""
+    if not isinstance(record, dict):
+        raise ValueError('Reading must be a JSON object')
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    fields = {FIELD_ALIASES.get(key, key): value for key, value in record.items()}
+
+    try:
+        admission_id = int(fields.get('admissionid'))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"admission_id must be an integer, got {fields.get('admissionid')!r}")
+    if admission_id not in admissions:
+        raise ValueError(f'Admission with ID {admission_id} not found')
+    admitted, discharged = (as_utc(moment) for moment in admissions[admission_id])
+
+    now = datetime.now(timezone.utc)
+    if fields.get('timestamp') is None:
+        timestamp = now
+    else:
+        try:
+            timestamp = parse_time(str(fields['timestamp']).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"timestamp must be an ISO 8601 date/time, got {fields['timestamp']!r}")
+    if timestamp > now + CLOCK_SKEW:
+        raise ValueError(f'timestamp {timestamp.isoformat()} is in the future')
+    if timestamp < admitted or (discharged is not None and timestamp > discharged):
+        raise ValueError(f'timestamp {timestamp.isoformat()} is outside admission {admission_id}')
+
+    temperature = fields.get('temperature')
+    if temperature is not None:
+        try:
+            temperature = Decimal(str(temperature)).quantize(Decimal('0.1'))
+        except InvalidOperation:
+            raise ValueError(f'temperature must be a number, got {temperature!r}')
+        if not TEMPERATURE_RANGE[0] <= temperature <= TEMPERATURE_RANGE[1]:
+            raise ValueError(f'temperature out of range: {fields["temperature"]!r}')
+    blood_pressure = fields.get('blood_pressure')
+    if blood_pressure is not None:
+        systolic, diastolic = parse_blood_pressure(blood_pressure)
+        blood_pressure = f'{systolic}/{diastolic}'
+    pulse_rate = fields.get('pulse_rate')
+    if pulse_rate is not None:
+        try:
+            pulse_rate = int(pulse_rate)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'pulse_rate must be an integer, got {pulse_rate!r}')
+        if not PULSE_RANGE[0] <= pulse_rate <= PULSE_RANGE[1]:
+            raise ValueError(f'pulse_rate out of range: {fields["pulse_rate"]!r}')
+    if temperature is None and blood_pressure is None and pulse_rate is None:
+        raise ValueError('Reading has no temperature, blood_pressure or pulse_rate')
+
+    recorder = fields.get('recorded_by')
+    if recorder is not None and recorder not in doctors:
+        raise ValueError(f'Doctor with username {recorder} not found')
+    notes = fields.get('notes')
+    return (admission_id, timestamp.isoformat(sep=' '), temperature, blood_pressure, pulse_rate,
+            None if notes is None else str(notes), recorder or recorded_by)
+
+
+def ingest(session, records, recorded_by=None):
+    """Validate ``records`` and insert the valid ones with one COPY in the
+    session's transaction (the caller commits). ``recorded_by`` is used for
+    readings that do not name their recorder, when it is a doctor. Returns
+    ``(inserted, errors)``, ``errors`` being ``{'index', 'error'}`` dicts
+    for the rejected readings."""
+    admission_ids, recorders = set(), {recorded_by} - {None}
+    for record in records:
+        if isinstance(record, dict):
+            try:
+                admission_ids.add(int(record.get('admission_id', record.get('admissionid'))))
+            except (TypeError, ValueError, OverflowError):
+                pass
+            if isinstance(record.get('recorded_by'), str):
+                recorders.add(record['recorded_by'])
+
+    admissions = {row.admissionid: (row.admissiondate, row.dischargedate) for row in session.execute(text(
+        "SELECT admissionid, admissiondate, dischargedate FROM admission WHERE admissionid = ANY(:ids)"),
+        {'ids': sorted(admission_ids)})}
+    doctors = set()
+    if recorders:
+        doctors = set(session.execute(text("SELECT username FROM doctordetails WHERE username = ANY(:names)"),
+                                      {'names': sorted(recorders)}).scalars())
+    default_recorder = recorded_by if recorded_by in doctors else None
+
+    rows, errors = [], []
+    for index, record in enumerate(records):
+        try:
+            rows.append(validate_reading(record, admissions, doctors, default_recorder))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    if rows:
+        cursor = session.connection().connection.cursor()
+        copy_rows(cursor, rows, 'admissiondetails', INGEST_COLUMNS)
+    return len(rows), errors
+
+
+if __name__ == '__main__':
+    from database import session_scope
+
+    parser = argparse.ArgumentParser(description="Print an admission's vitals, raw or bucketed")
+    parser.add_argument('admission_id', type=int)
+    parser.add_argument('--start', help='ISO timestamp (default: admission date)')
+    parser.add_argument('--end', help='ISO timestamp (default: discharge date or now)')
+    parser.add_argument('--bucket', help='bucket width such as 300, 5m, 1h (default: raw readings)')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        admitted, discharged = session.execute(text(
+            "SELECT admissiondate, dischargedate FROM admission WHERE admissionid = :id"),
+            {'id': args.admission_id}).one()
+        start, end = window(admitted, discharged, args.start, args.end)
+        if args.bucket:
+            rows, _ = buckets(session, args.admission_id, start, end, parse_bucket(args.bucket), args.limit)
+            for row in rows:
+                print(f"{row.start:%Y-%m-%d %H:%M}  n={row.readings:<5} " + '  '.join(
+                    f"{vital} {getattr(row, vital + '_min')}-{getattr(row, vital + '_max')}" for vital in VITALS))
+        else:
+            for row in readings(session, args.admission_id, start, end, args.limit):
+                print(f"{row.timestamp:%Y-%m-%d %H:%M}  {row.temperature}  {row.blood_pressure}  "
+                      f"{row.pulse_rate}  {row.doctorname or ''}")